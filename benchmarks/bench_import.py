@@ -0,0 +1,63 @@
+"""
+Import-time benchmark for the pipeline entry point.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter
+several times and reports the median cumulative import time of the target
+module, plus which optional backends were loaded along the way.
+
+    python benchmarks/bench_import.py            # import main
+    python benchmarks/bench_import.py utils.load --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_BACKENDS = ["sqlalchemy", "gspread", "google.oauth2", "bs4", "requests", "pytz"]
+
+
+def measure(module):
+    """Return (cumulative_us, {top-level import: cumulative_us}) for one cold import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        try:
+            cumulative = int(parts[1])
+        except ValueError:
+            continue  # baris header
+        imported[parts[2].strip()] = cumulative
+    return imported.get(module, 0), imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("module", nargs="?", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = []
+    imported = {}
+    for _ in range(args.runs):
+        total, imported = measure(args.module)
+        timings.append(total)
+
+    print(f"import {args.module}: median {statistics.median(timings) / 1000:.1f} ms "
+          f"(min {min(timings) / 1000:.1f} ms, runs={args.runs})")
+    for backend in HEAVY_BACKENDS:
+        status = f"{imported[backend] / 1000:.1f} ms" if backend in imported else "not imported"
+        print(f"  {backend:<14} {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Memory benchmark for the transform output schema.
+
+Loads a transformed export (default: product.csv), optionally replicated to
+a larger row count, and prints deep memory usage per column and bytes per
+row for the default object schema and for compact_frame().
+
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py product.csv --rows 1000000
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.reader import read_transformed_csv  # noqa: E402
+from utils.transform import compact_frame, memory_report  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", nargs="?", default=os.path.join(ROOT, "product.csv"))
+    parser.add_argument("--rows", type=int, help="Replikasi data sampai jumlah baris ini")
+    args = parser.parse_args()
+
+    df = read_transformed_csv(args.path)
+    if args.rows and args.rows > len(df):
+        repeats = -(-args.rows // len(df))
+        df = pd.concat([df] * repeats, ignore_index=True).iloc[:args.rows]
+
+    compact = compact_frame(df)
+    before, after = memory_report(df), memory_report(compact)
+
+    print(f"{'column':<18}{'default':>14}{'compact':>14}")
+    usage_before = df.memory_usage(deep=True, index=False)
+    usage_after = compact.memory_usage(deep=True, index=False)
+    for col in df.columns:
+        print(f"{col:<18}{usage_before[col]:>14,}{usage_after[col]:>14,}")
+    print(f"{'bytes/row':<18}{before['bytes_per_row']:>14}{after['bytes_per_row']:>14}")
+    print(f"rows={before['rows']:,}  reduction={1 - after['bytes'] / before['bytes']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import json
+import pytest
+
+from utils.config import load_config, ConfigError, DEFAULTS
+
+
+def test_defaults_without_overrides():
+    """Test konfigurasi default tanpa file, env, maupun argumen"""
+    config = load_config([], environ={})
+    assert config["stages"] == ["extract", "transform", "validate", "load"]
+    assert config["sinks"] == ["csv", "pg", "sheets"]
+    assert config["max_pages"] == DEFAULTS["max_pages"]
+    assert config["chunk_size"] is None
+
+
+def test_precedence_file_env_cli(tmp_path):
+    """Test urutan prioritas: file < env < CLI"""
+    cfg_file = tmp_path / "etl.json"
+    cfg_file.write_text(json.dumps({"max_pages": 5, "workers": 2, "pg_table": "from_file"}))
+
+    config = load_config(
+        ["--config", str(cfg_file), "--workers", "8"],
+        environ={"ETL_MAX_PAGES": "10", "ETL_WORKERS": "4"},
+    )
+    assert config["max_pages"] == 10
+    assert config["workers"] == 8
+    assert config["pg_table"] == "from_file"
+
+
+def test_stage_and_sink_selection():
+    """Test pemilihan stage dan sink lewat argumen"""
+    config = load_config(
+        ["--stages", "load", "--sinks", "csv,pg", "--transformed-input", "product.csv"],
+        environ={},
+    )
+    assert config["stages"] == ["load"]
+    assert config["sinks"] == ["csv", "pg"]
+
+
+def test_config_file_from_env(tmp_path):
+    """Test path file konfigurasi dari ETL_CONFIG"""
+    cfg_file = tmp_path / "etl.json"
+    cfg_file.write_text(json.dumps({"sinks": ["csv"], "chunk_size": 1000}))
+    config = load_config([], environ={"ETL_CONFIG": str(cfg_file)})
+    assert config["sinks"] == ["csv"]
+    assert config["chunk_size"] == 1000
+
+
+@pytest.mark.parametrize("argv, environ", [
+    (["--stages", "extract,publish"], {}),
+    (["--sinks", "s3"], {}),
+    (["--workers", "0"], {}),
+    ([], {"ETL_MAX_PAGES": "banyak"}),
+    (["--stages", "transform,load"], {}),
+    (["--stages", "load"], {}),
+    (["--sinks", ""], {}),
+    ([], {"ETL_SINKS": ""}),
+])
+def test_invalid_config(argv, environ):
+    with pytest.raises(ConfigError):
+        load_config(argv, environ=environ)
+
+
+def test_unknown_key_in_file(tmp_path):
+    cfg_file = tmp_path / "etl.json"
+    cfg_file.write_text(json.dumps({"max_page": 5}))
+    with pytest.raises(ConfigError):
+        load_config(["--config", str(cfg_file)], environ={})
+
+
+def test_backfill_into_its_own_input_is_rejected(tmp_path):
+    """Test sink CSV tidak boleh menimpa file yang sedang di-backfill"""
+    export = tmp_path / "product.csv"
+    export.write_text("Title\nA\n")
+    argv = ["--backfill", str(export), "--csv-path", str(tmp_path / "." / "product.csv")]
+    with pytest.raises(ConfigError, match="input backfill"):
+        load_config(argv, environ={})
+
+    load_config(argv + ["--sinks", "pg"], environ={})
+    load_config(["--backfill", str(export), "--csv-path", str(tmp_path / "out.csv")], environ={})
+
+
+def test_empty_sinks_allowed_without_load():
+    cfg = load_config(["--stages", "extract", "--sinks", ""], environ={})
+    assert cfg["sinks"] == []
@@ -0,0 +1,207 @@
+import threading
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from utils.config import load_config
+from utils.dag import Dag, DagError, fingerprint
+from utils.transform import TransformationError
+
+
+def frame(title='A', timestamp='2025-05-25T13:09:32+07:00'):
+    return pd.DataFrame({'Title': [title], 'scrape_timestamp': [timestamp]})
+
+
+def test_independent_nodes_run_in_parallel():
+    """Test node tanpa ketergantungan satu sama lain berjalan bersamaan"""
+    barrier = threading.Barrier(2, timeout=5)
+    dag = Dag(max_workers=2)
+    dag.add("source", lambda: 1)
+    dag.add("left", lambda x: barrier.wait() is not None and x + 1, ["source"])
+    dag.add("right", lambda x: barrier.wait() is not None and x + 2, ["source"])
+    dag.add("sum", lambda a, b: a + b, ["left", "right"])
+
+    results = dag.run()
+    assert results["sum"] == 5
+    assert dag.ok()
+    assert set(dag.report) == {"source", "left", "right", "sum"}
+    assert all(entry["seconds"] >= 0 for entry in dag.report.values())
+
+
+def test_unchanged_input_uses_cached_output(tmp_path):
+    calls = []
+
+    def build(source):
+        dag = Dag(cache_dir=str(tmp_path))
+        dag.add("extract", lambda: source, cache=False)
+        dag.add("transform", lambda df: calls.append("t") or df.assign(n=1), ["extract"])
+        dag.add("load", lambda df: calls.append("l") or True, ["transform"])
+        return dag
+
+    build(frame()).run()
+    dag = build(frame())
+    results = dag.run()
+    assert calls == ["t", "l"]
+    assert dag.report["transform"]["status"] == "cached"
+    assert dag.report["load"]["status"] == "cached"
+    assert list(results["transform"]["n"]) == [1]
+
+    build(frame(title='B')).run()
+    assert calls == ["t", "l", "t", "l"]
+    # Hanya output terbaru per node yang disimpan
+    assert len(list(tmp_path.glob("transform-*.pkl"))) == 1
+
+
+def test_volatile_columns_do_not_invalidate_downstream(tmp_path):
+    calls = []
+    for timestamp in ('2025-05-25T13:00:00+07:00', '2025-05-26T08:00:00+07:00'):
+        dag = Dag(cache_dir=str(tmp_path))
+        dag.add("extract", lambda ts=timestamp: frame(timestamp=ts),
+                cache=False, volatile_columns=["scrape_timestamp"])
+        dag.add("transform", lambda df: calls.append(1) or df, ["extract"])
+        dag.run()
+    assert calls == [1]
+
+
+def test_params_are_part_of_cache_key(tmp_path):
+    calls = []
+    for path in ("a.csv", "a.csv", "b.csv"):
+        dag = Dag(cache_dir=str(tmp_path))
+        dag.add("source", lambda: 1)
+        dag.add("load", lambda x, p=path: calls.append(p) or True, ["source"], params={"path": path})
+        dag.run()
+    assert calls == ["a.csv", "b.csv"]
+
+
+def test_failed_node_skips_dependents_only():
+    dag = Dag()
+    dag.add("source", lambda: 1)
+    dag.add("broken", lambda x: 1 / 0, ["source"])
+    dag.add("after_broken", lambda x: x, ["broken"])
+    dag.add("other", lambda x: x * 10, ["source"])
+
+    results = dag.run()
+    assert results["other"] == 10
+    assert dag.report["broken"]["status"] == "failed"
+    assert "division by zero" in dag.report["broken"]["error"]
+    assert dag.report["after_broken"]["status"] == "skipped"
+    assert not dag.ok()
+
+
+def test_invalid_graph():
+    dag = Dag()
+    dag.add("a", lambda x: x, ["b"])
+    dag.add("b", lambda x: x, ["a"])
+    with pytest.raises(DagError, match="Siklus"):
+        dag.run()
+
+    dag = Dag()
+    dag.add("a", lambda x: x, ["missing"])
+    with pytest.raises(DagError, match="tidak dikenal"):
+        dag.run()
+    with pytest.raises(DagError):
+        dag.add("a", lambda: 1)
+
+
+def test_fingerprint_covers_values_and_dtypes():
+    assert fingerprint(frame()) == fingerprint(frame())
+    assert fingerprint(frame()) != fingerprint(frame(title='B'))
+    assert fingerprint(frame()) != fingerprint(frame().astype({'Title': 'category'}))
+    assert fingerprint(frame(), ['scrape_timestamp']) == fingerprint(
+        frame(timestamp='2030-01-01T00:00:00+07:00'), ['scrape_timestamp']
+    )
+
+
+@patch('main.save_to_google_sheets')
+@patch('main.save_to_postgresql')
+@patch('main.save_to_csv')
+def test_run_pipeline_loads_sinks_and_skips_unchanged(mock_csv, mock_pg, mock_sheets, tmp_path):
+    """Test pipeline DAG: semua sink di-load, run kedua dengan input sama dilewati"""
+    from main import run_pipeline
+
+    source = tmp_path / "product.csv"
+    pd.DataFrame({
+        'Title': ['T-shirt 2'], 'Price': [1634400.0], 'Rating': [3.9], 'Colors': [3],
+        'Size': ['M'], 'Gender': ['Women'], 'scrape_timestamp': ['2025-05-25T13:09:32+07:00'],
+    }).to_csv(source, index=False)
+    config = load_config([
+        '--stages', 'validate,load', '--transformed-input', str(source),
+        '--stage-cache-dir', str(tmp_path / "stages"),
+    ])
+
+    metrics = {}
+    assert run_pipeline(config, metrics)
+    assert metrics["validation"]["total_rows"] == 1
+    assert {name: entry["status"] for name, entry in metrics["stages"].items()} == {
+        "transform": "ran", "validate": "ran",
+        "load:csv": "ran", "load:pg": "ran", "load:sheets": "ran",
+    }
+
+    metrics = {}
+    assert run_pipeline(config, metrics)
+    assert metrics["stages"]["load:pg"]["status"] == "cached"
+    assert mock_csv.call_count == mock_pg.call_count == mock_sheets.call_count == 1
+
+
+@patch('main.save_to_csv')
+@patch('main.transform_data', side_effect=TransformationError("kolom Price tidak ada"))
+def test_run_pipeline_logs_transform_failure(mock_transform, mock_csv, tmp_path, caplog):
+    from main import run_pipeline
+
+    source = tmp_path / "raw.csv"
+    pd.DataFrame({'Title': ['T-shirt 2']}).to_csv(source, index=False)
+    config = load_config([
+        '--stages', 'transform,validate,load', '--raw-input', str(source), '--sinks', 'csv',
+    ])
+
+    metrics = {}
+    assert not run_pipeline(config, metrics)
+    assert "Transform failed: kolom Price tidak ada" in caplog.text
+    assert metrics["stages"]["load:csv"]["status"] == "skipped"
+    mock_csv.assert_not_called()
+
+
+@patch('main.save_to_google_sheets')
+@patch('main.save_to_postgresql')
+@patch('main.save_to_csv')
+def test_dedup_index_feeds_per_sink_nodes(mock_csv, mock_pg, mock_sheets, tmp_path):
+    """Test mode dedup: node load per sink, index hanya di-commit jika semua sink berhasil"""
+    from main import run_pipeline
+    from utils.load import LoadError
+
+    source = tmp_path / "product.csv"
+    pd.DataFrame({
+        'Title': ['T-shirt 2'], 'Price': [1634400.0], 'Rating': [3.9], 'Colors': [3],
+        'Size': ['M'], 'Gender': ['Women'], 'scrape_timestamp': ['2025-05-25T13:09:32+07:00'],
+    }).to_csv(source, index=False)
+    config = load_config([
+        '--stages', 'load', '--transformed-input', str(source),
+        '--dedup-index', str(tmp_path / "keys.sqlite"),
+    ])
+
+    mock_pg.side_effect = LoadError("koneksi ditolak")
+    metrics = {}
+    assert not run_pipeline(config, metrics)
+    statuses = {name: entry["status"] for name, entry in metrics["stages"].items()}
+    assert statuses["load:csv"] == statuses["load:sheets"] == "ran"
+    assert statuses["load:pg"] == "failed"
+    assert statuses["dedup_commit"] == "skipped"
+
+    # Key tidak disimpan, jadi baris yang sama di-load lagi setelah sink pulih
+    mock_pg.side_effect = None
+    assert run_pipeline(config, {})
+    assert mock_pg.call_count == 2
+    assert mock_pg.call_args.kwargs["if_exists"] == "append"
+
+    assert run_pipeline(config, {})
+    assert mock_csv.call_count == 2
+
+
+def test_on_finish_runs_after_failure():
+    closed = []
+    dag = Dag()
+    dag.add("broken", lambda: 1 / 0)
+    dag.on_finish(lambda: closed.append(True))
+    dag.run()
+    assert closed == [True]
+    assert dag.report["broken"]["status"] == "failed"
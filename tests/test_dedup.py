@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from utils.config import load_config
+from utils.dedup import KeyIndex, duplicate_mask, hash_keys, DedupError
+from utils.transform import transform_data, compact_frame
+
+
+def products(titles, price=10.0):
+    return pd.DataFrame({
+        'Title': titles,
+        'Price': [price] * len(titles),
+        'Size': ['M'] * len(titles),
+        'scrape_timestamp': ['2025-05-25T13:09:32+07:00'] * len(titles),
+    })
+
+
+def test_duplicate_mask_matches_pandas_duplicated():
+    df = pd.DataFrame({
+        'a': [1, 1, 2, None, None],
+        'b': ['x', 'x', 'y', None, None],
+        'c': [0.5, 0.5, 0.5, np.nan, np.nan],
+    })
+    assert duplicate_mask(df).tolist() == df.duplicated().tolist()
+    assert duplicate_mask(df, ['c']).tolist() == df.duplicated(subset=['c']).tolist()
+
+
+def test_key_index_across_chunks():
+    """Test duplikat antar chunk dikenali dan dihitung"""
+    index = KeyIndex(['Title', 'Size'])
+    first = index.filter(products(['A', 'B', 'A']))
+    second = index.filter(products(['B', 'C'], price=99.0))
+
+    assert list(first['Title']) == ['A', 'B']
+    assert list(second['Title']) == ['C']
+    stats = index.stats()
+    assert stats['rows_seen'] == 5
+    assert stats['unique_keys'] == 3
+    assert stats['duplicates'] == 2
+    assert stats['memory_bytes'] == 3 * 16
+    assert stats['collision_probability'] < 1e-30
+
+
+def test_persistent_index_across_runs(tmp_path):
+    """Test index di disk dipakai ulang oleh run berikutnya"""
+    path = str(tmp_path / "keys.sqlite")
+    with KeyIndex(['Title'], path=path) as index:
+        index.filter(products(['A', 'B']))
+
+    with KeyIndex(['Title'], path=path) as index:
+        new = index.filter(products(['A', 'B', 'C']))
+        assert list(new['Title']) == ['C']
+        assert len(index) == 3
+
+
+def test_close_without_commit_discards_new_keys(tmp_path):
+    path = str(tmp_path / "keys.sqlite")
+    index = KeyIndex(['Title'], path=path)
+    index.filter(products(['A']))
+    index.close(commit=False)
+
+    with KeyIndex(['Title'], path=path) as index:
+        assert len(index.filter(products(['A']))) == 1
+
+
+def test_spill_keeps_memory_bounded(tmp_path):
+    """Test key dipindah ke disk saat melewati max_memory_keys"""
+    index = KeyIndex(['Title'], path=str(tmp_path / "keys.sqlite"), max_memory_keys=50)
+    for start in range(0, 500, 40):
+        chunk = products([f"P{i}" for i in range(start, start + 40)])
+        assert len(index.filter(chunk)) == 40
+        assert index.stats()['memory_bytes'] <= 90 * 16
+
+    again = products([f"P{i}" for i in range(0, 540, 10)])
+    assert list(index.filter(again)['Title']) == ['P520', 'P530']
+    assert index.stats()['unique_keys'] == 522
+    index.close()
+
+
+def test_default_and_compact_schema_share_keys():
+    raw = pd.DataFrame({
+        'Title': ['A', 'A', 'B', 'B'],
+        'Price': ['10.10', '10.10', '20.00', '20.00'],
+        'Size': ['M', 'M', 'L', 'L'],
+        'Gender': ['Men'] * 4,
+        'scrape_timestamp': ['2025-05-25T13:09:32.123456+07:00'] * 4,
+        'Colors': [3, 3, 5, 5],
+    }).iloc[[0, 2]]
+    df = transform_data(raw)
+    cols = ['Title', 'Price', 'Size', 'Colors', 'scrape_timestamp']
+    np.testing.assert_array_equal(hash_keys(df, cols), hash_keys(compact_frame(df), cols))
+
+
+def test_transform_with_shared_key_index():
+    """Test transform streaming memakai satu index untuk semua chunk"""
+    index = KeyIndex()
+    first = transform_data(products(['A', 'B']).astype({'Price': str}), key_index=index)
+    second = transform_data(products(['B', 'C']).astype({'Price': str}), key_index=index)
+    assert list(first['Title']) + list(second['Title']) == ['A', 'B', 'C']
+
+
+def test_missing_key_column():
+    with pytest.raises(DedupError):
+        KeyIndex(['SKU']).filter(products(['A']))
+
+
+def test_default_key_ignores_scrape_timestamp():
+    index = KeyIndex()
+    index.filter(products(['A', 'B']))
+    later = products(['A', 'B']).assign(scrape_timestamp='2025-06-01T08:00:00+07:00')
+    assert index.filter(later).empty
+
+
+@patch('main.save_to_csv')
+def test_rescrape_with_new_timestamps_loads_nothing(mock_csv, tmp_path):
+    """Test dua extract yang hanya berbeda timestamp: run kedua tidak me-load apa pun"""
+    from main import run_pipeline
+
+    first = transform_data(products(['A', 'B']).astype({'Price': str}))
+    second = first.assign(scrape_timestamp='2025-06-01T08:00:00.123456+07:00')
+    runs = []
+    for i, df in enumerate([first, second]):
+        path = tmp_path / f"product_{i}.csv"
+        df.to_csv(path, index=False)
+        runs.append(load_config([
+            '--stages', 'load', '--transformed-input', str(path),
+            '--dedup-index', str(tmp_path / "keys.sqlite"), '--sinks', 'csv',
+        ]))
+
+    assert run_pipeline(runs[0], {})
+    metrics = {}
+    assert run_pipeline(runs[1], metrics)
+    assert mock_csv.call_count == 1
+    assert metrics["dedup"]["duplicates"] == 2
+
+
+def test_numeric_keys_keep_full_precision():
+    """Test nilai yang hanya berbeda di luar presisi float32 tidak dianggap duplikat"""
+    df = pd.DataFrame({
+        'Price': [20000001.0, 20000000.0],
+        'Rating': [4.80000001, 4.80000002],
+    })
+    assert duplicate_mask(df).tolist() == df.duplicated().tolist() == [False, False]
+    assert duplicate_mask(df, ['Price']).tolist() == [False, False]
+    assert len(KeyIndex().filter(df)) == 2
+
+
+def test_rollback_after_spill_keeps_rows_new(tmp_path):
+    """Test key yang sudah dipindah ke staging tetap dibuang oleh close(commit=False)"""
+    path = str(tmp_path / "keys.sqlite")
+    index = KeyIndex(['Title'], path=path, max_memory_keys=2)
+    assert len(index.filter(products(list('ABCDE')))) == 5
+    assert index.stats()['memory_bytes'] == 0
+    assert index.filter(products(list('AE'))).empty
+    index.close(commit=False)
+
+    with KeyIndex(['Title'], path=path, max_memory_keys=2) as index:
+        assert len(index.filter(products(list('ABCDE')))) == 5
+    with KeyIndex(['Title'], path=path) as index:
+        assert index.filter(products(list('ABCDE'))).empty
+        assert index.stats()['disk_keys'] == 5
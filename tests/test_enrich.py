@@ -0,0 +1,94 @@
+import pandas as pd
+from unittest.mock import patch, Mock
+from requests.exceptions import Timeout
+
+from utils.cache import ResponseCache
+from utils.enrich import parse_detail, fetch_details, enrich_products
+from utils.extract import extract_data
+
+DETAIL_HTML = """
+<div class="product-detail">
+    <p class="product-description">Jaket kulit asli dengan lapisan hangat.</p>
+    <ul>
+        <li>Material: Leather</li>
+        <li>Fit: Regular</li>
+    </ul>
+</div>
+"""
+
+
+def test_parse_detail_fields():
+    """Test parsing deskripsi dan pasangan label: nilai"""
+    fields = parse_detail(DETAIL_HTML)
+    assert fields["Description"] == "Jaket kulit asli dengan lapisan hangat."
+    assert fields["Material"] == "Leather"
+    assert fields["Fit"] == "Regular"
+
+
+def test_extract_collects_detail_urls():
+    """Test extract menyimpan link detail bila diminta"""
+    listing = """
+    <div class="collection-card">
+        <a href="/products/1"><h3 class="product-title">Jacket 1</h3></a>
+        <span class="price">$10.00</span>
+    </div>
+    """
+    with patch('utils.extract.requests.get') as mock_get:
+        mock_get.return_value = Mock(text=listing, raise_for_status=Mock())
+        df_plain = extract_data(max_pages=1)
+        df = extract_data(max_pages=1, with_detail_urls=True)
+
+    assert 'detail_url' not in df_plain.columns
+    assert df.iloc[0]['detail_url'] == "https://fashion-studio.dicoding.dev/products/1"
+
+
+def test_fetch_details_deduplicates_urls():
+    """Test setiap URL detail hanya diambil sekali"""
+    urls = ["http://x/p/1", "http://x/p/2", "http://x/p/1", None, "http://x/p/2"]
+    with patch('utils.extract.requests.get') as mock_get:
+        mock_get.return_value = Mock(text=DETAIL_HTML, raise_for_status=Mock())
+        details = fetch_details(urls, max_workers=2)
+
+    assert mock_get.call_count == 2
+    assert set(details) == {"http://x/p/1", "http://x/p/2"}
+
+
+def test_fetch_details_skips_failed_pages():
+    def side_effect(url, *args, **kwargs):
+        if url.endswith("/2"):
+            raise Timeout("timeout")
+        return Mock(text=DETAIL_HTML, raise_for_status=Mock())
+
+    with patch('utils.extract.requests.get', side_effect=side_effect):
+        details = fetch_details(["http://x/p/1", "http://x/p/2"], max_workers=2)
+
+    assert list(details) == ["http://x/p/1"]
+
+
+def test_enrich_products_merges_fields_and_uses_cache():
+    """Test atribut detail digabung ke tiap baris dan cache dipakai ulang"""
+    df = pd.DataFrame({
+        'Title': ['Jacket 1', 'Jacket 1 (dup)', 'Pants 2'],
+        'Price': ['10.00', '10.00', '20.00'],
+        'Size': [None, 'M', 'L'],
+        'detail_url': ['http://x/p/1', 'http://x/p/1', None],
+    })
+    detail = DETAIL_HTML + "<p>Size: XL</p>"
+    cache = ResponseCache(ttl=60)
+
+    with patch('utils.extract.requests.get') as mock_get:
+        mock_get.return_value = Mock(text=detail, raise_for_status=Mock())
+        result = enrich_products(df, max_workers=2, cache=cache)
+        enrich_products(df, max_workers=2, cache=cache)
+        assert mock_get.call_count == 1
+
+    assert list(result['Material'].iloc[:2]) == ['Leather', 'Leather']
+    assert pd.isna(result['Material'].iloc[2])
+    # Kolom yang sudah terisi dari listing tidak ditimpa
+    assert list(result['Size']) == ['XL', 'M', 'L']
+    assert len(result) == len(df)
+
+
+def test_enrich_without_detail_urls_is_noop():
+    df = pd.DataFrame({'Title': ['A'], 'Price': ['1.00']})
+    assert enrich_products(df) is df
@@ -5,7 +5,11 @@ from requests.exceptions import HTTPError, Timeout
 import logging
 from bs4 import BeautifulSoup
 from utils.extract import extract_data
+from utils.cache import ResponseCache
 import re
+import os
+import subprocess
+import sys
 
 
 # Test case tambahan
@@ -144,4 +148,79 @@ def test_extract_handles_multiple_pages():
         # Verifikasi hasil
         assert len(df) == 2, f"Actual data: {df.to_dict()}"
         assert set(df['Title']) == {"Product 1", "Product 2"}
-        assert list(df['Price']) == ['10.00', '20.00']
\ No newline at end of file
+        assert list(df['Price']) == ['10.00', '20.00']
+
+def test_extract_concurrent_workers_keep_page_order():
+    """Test ekstraksi paralel tetap mengikuti urutan halaman"""
+    def side_effect(url, *args, **kwargs):
+        m = re.search(r"/page(\d+)$", url)
+        page = int(m.group(1)) if m else 1
+        html = f"""
+        <div class="collection-card">
+            <h3 class="product-title">Product {page}</h3>
+            <span class="price">$1.00</span>
+        </div>
+        """
+        return Mock(text=html, raise_for_status=Mock())
+
+    with patch('utils.extract.requests.get', side_effect=side_effect) as mock_get:
+        df = extract_data(max_pages=6, max_workers=3)
+
+    assert mock_get.call_count == 6
+    assert list(df['Title']) == [f"Product {i}" for i in range(1, 7)]
+
+
+def test_extract_uses_response_cache(tmp_path):
+    """Test halaman yang sudah di-cache tidak diambil ulang"""
+    html = """
+    <div class="collection-card">
+        <h3 class="product-title">Cached Product</h3>
+        <span class="price">$5.00</span>
+    </div>
+    """
+    cache = ResponseCache(ttl=60, cache_dir=str(tmp_path))
+
+    with patch('utils.extract.requests.get') as mock_get:
+        mock_get.return_value = Mock(text=html, raise_for_status=Mock())
+        extract_data(max_pages=2, cache=cache)
+        assert mock_get.call_count == 2
+
+    # Cache baru membaca entri dari disk
+    cache = ResponseCache(ttl=60, cache_dir=str(tmp_path))
+    with patch('utils.extract.requests.get') as mock_get:
+        df = extract_data(max_pages=2, cache=cache)
+        assert mock_get.call_count == 0
+
+    assert list(df['Title']) == ["Cached Product"] * 2
+    assert cache.stats()["hits"] == 2
+
+
+def test_import_does_not_load_scraping_backends():
+    """Test import modul tidak langsung memuat requests/bs4"""
+    code = (
+        "import sys, main; "
+        "print(','.join(m for m in ('requests', 'bs4', 'sqlalchemy', 'gspread') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_response_cache_keeps_bodies_on_disk_only(tmp_path):
+    """Test dengan cache_dir, isi halaman tidak disimpan di memori"""
+    cache = ResponseCache(ttl=60, cache_dir=str(tmp_path))
+    cache.set("http://a/1", "<html>1</html>")
+    assert all(text is None for _, text in cache._entries.values())
+    assert cache.get("http://a/1") == "<html>1</html>"
+    assert cache.get("http://a/2") is None
+
+
+def test_response_cache_lru_limit():
+    cache = ResponseCache(ttl=60, max_entries=2)
+    for i in range(3):
+        cache.set(f"http://a/{i}", str(i))
+    assert cache.get("http://a/0") is None
+    assert cache.get("http://a/2") == "2"
+    assert cache.stats()["entries"] == 2
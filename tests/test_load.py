@@ -1,4 +1,7 @@
 import csv
+import os
+import subprocess
+import sys
 import pytest
 from unittest.mock import patch, MagicMock, ANY
 import pandas as pd
@@ -33,6 +36,21 @@ def test_save_to_csv_invalid(df, path):
     with pytest.raises(LoadError):
         save_to_csv(df, path)
 
+def test_save_to_csv_append(tmp_path):
+    df = pd.DataFrame({'a': [1, 2]})
+    file_path = tmp_path / "out.csv"
+    with patch.object(pd.DataFrame, 'to_csv') as mock_csv:
+        save_to_csv(df, str(file_path), append=True)
+        mock_csv.assert_called_once_with(
+            str(file_path),
+            mode='a',
+            header=False,
+            index=False,
+            quoting=csv.QUOTE_ALL,
+            encoding='utf-8',
+            date_format='%Y-%m-%d %H:%M:%S'
+        )
+
 # ------------ Test save_to_postgresql ------------
 
 def test_save_to_postgresql_success():
@@ -43,9 +61,24 @@ def test_save_to_postgresql_success():
             save_to_postgresql(df, "tbl", "conn")
             mock_engine.assert_called_once_with("conn")
             mock_sql.assert_called_once_with(
-                "tbl", con=engine, if_exists='replace', index=False
+                "tbl", con=engine, if_exists='replace', index=False, chunksize=None,
+                dtype=None
             )
 
+def test_save_to_postgresql_passes_chunksize():
+    df = pd.DataFrame({'a': [1, 2]})
+    with patch('utils.load.create_engine', return_value=MagicMock()):
+        with patch.object(pd.DataFrame, 'to_sql', return_value=None) as mock_sql:
+            save_to_postgresql(df, "tbl", "conn", chunksize=500)
+            assert mock_sql.call_args.kwargs['chunksize'] == 500
+
+def test_save_to_postgresql_append():
+    df = pd.DataFrame({'a': [1, 2]})
+    with patch('utils.load.create_engine', return_value=MagicMock()):
+        with patch.object(pd.DataFrame, 'to_sql', return_value=None) as mock_sql:
+            save_to_postgresql(df, "tbl", "conn", if_exists='append')
+            assert mock_sql.call_args.kwargs['if_exists'] == 'append'
+
 @pytest.mark.parametrize("df, table, conn", [
     (pd.DataFrame(), "tbl", "conn"),
     (None, "tbl", "conn"),
@@ -104,6 +137,23 @@ def test_save_to_google_sheets_success():
                 value_input_option='USER_ENTERED'
             )
 
+def test_save_to_google_sheets_append():
+    df = pd.DataFrame({'a': [1, 2], 'b': [3, None]})
+    fake_client = MagicMock()
+    fake_sheet = MagicMock()
+    fake_client.open_by_key.return_value = fake_client
+    fake_client.worksheet.return_value = fake_sheet
+
+    with patch('utils.load.Credentials.from_service_account_file', return_value=MagicMock()):
+        with patch('utils.load.gspread.authorize', return_value=fake_client):
+            save_to_google_sheets(df, 'sheet_id', 'Sheet1!A1', 'cred.json', append=True)
+
+    fake_sheet.batch_clear.assert_not_called()
+    fake_sheet.update.assert_not_called()
+    fake_sheet.append_rows.assert_called_once_with(
+        [['1', '3.0'], ['2', '']], value_input_option='USER_ENTERED'
+    )
+
 @pytest.mark.parametrize("params", [
     ({'df': pd.DataFrame(), 'sid':'sheet','rng':'A1','cred':'c'}),
     ({'df': None, 'sid':'sheet','rng':'A1','cred':'c'}),
@@ -144,3 +194,58 @@ def test_save_to_google_sheets_update_error(mock_auth):
     with patch('utils.load.Credentials.from_service_account_file', return_value=fake_creds):
         with pytest.raises(LoadError):
             save_to_google_sheets(df, 'sheet', 'Sheet1!A1', 'cred.json')
+
+# ------------ Test lazy import backend ------------
+
+def test_import_does_not_load_sink_backends():
+    code = (
+        "import sys, utils.load; "
+        "print(','.join(m for m in ('sqlalchemy', 'gspread', 'google.oauth2') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    assert result.stdout.strip() == ""
+
+# ------------ Test skema compact pada sink ------------
+
+def compact_sample():
+    return pd.DataFrame({
+        'Title': pd.Categorical(['Jaket "Kulit"', 'Celana']),
+        'Price': pd.Series([160000.0, 1634400.0], dtype='float32'),
+        'Size': pd.Categorical(['M', None]),
+        'scrape_timestamp': pd.to_datetime(
+            ['2025-05-25T13:09:32.643265+07:00'] * 2
+        ).tz_convert('Asia/Jakarta'),
+    })
+
+def test_save_to_csv_compact_dtypes(tmp_path):
+    path = tmp_path / "out.csv"
+    save_to_csv(compact_sample(), str(path))
+    lines = path.read_text(encoding='utf-8-sig').splitlines()
+    assert lines[1] == (
+        '"Jaket \'Kulit\'","160000.0","M","2025-05-25T13:09:32.643265+07:00"'
+    )
+    assert lines[2] == '"Celana","1634400.0","","2025-05-25T13:09:32.643265+07:00"'
+
+def test_save_to_postgresql_maps_float32_to_real():
+    with patch('utils.load.create_engine', return_value=MagicMock()):
+        with patch.object(pd.DataFrame, 'to_sql', return_value=None) as mock_sql:
+            save_to_postgresql(compact_sample(), "tbl", "conn")
+    dtype = mock_sql.call_args.kwargs['dtype']
+    assert list(dtype) == ['Price']
+    assert dtype['Price'].__class__.__name__ == 'REAL'
+
+def test_save_to_google_sheets_compact_dtypes():
+    fake_client = MagicMock()
+    fake_sheet = MagicMock()
+    fake_client.open_by_key.return_value = fake_client
+    fake_client.worksheet.return_value = fake_sheet
+
+    with patch('utils.load.Credentials.from_service_account_file', return_value=MagicMock()):
+        with patch('utils.load.gspread.authorize', return_value=fake_client):
+            save_to_google_sheets(compact_sample(), 'sheet_id', 'Sheet1!A1', 'cred.json')
+
+    values = fake_sheet.update.call_args.kwargs['values']
+    assert values[2] == ['Celana', '1634400.0', '', '2025-05-25T13:09:32.643265+07:00']
@@ -0,0 +1,193 @@
+import time
+import pytest
+from unittest.mock import patch, Mock
+from requests.exceptions import ConnectionError, HTTPError
+
+from utils.extract import extract_data, fetch_page
+from utils.ratelimit import (
+    HostController, RateController, CircuitOpenError, parse_retry_after, OPEN, CLOSED, HALF_OPEN
+)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("bukan tanggal") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_aimd_increase_and_decrease():
+    """Test limit naik aditif saat sukses dan turun setengah saat gagal"""
+    host = HostController("x", initial_limit=4, max_limit=8)
+    for _ in range(4):
+        host.acquire()
+        host.release(0.1, ok=True)
+    assert 4 < host.limit < 6
+
+    host.acquire()
+    host.release(0.1, ok=False)
+    assert host.limit == pytest.approx(2.5, abs=0.5)
+    assert host.snapshot()["errors"] == 1
+
+
+def test_slow_response_reduces_limit():
+    host = HostController("x", initial_limit=4, slow_factor=3)
+    host.acquire()
+    host.release(0.1, ok=True)
+    before = host.limit
+    host.acquire()
+    host.release(1.0, ok=True)
+    assert host.limit == pytest.approx(before / 2)
+
+
+def test_breaker_opens_and_rejects_fast():
+    host = HostController("x", failure_threshold=3, cooldown=60)
+    for _ in range(3):
+        host.acquire()
+        host.release(0.1, ok=False)
+    assert host.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        host.acquire()
+    assert host.snapshot()["rejected"] == 1
+
+
+def test_breaker_half_open_probe_closes():
+    host = HostController("x", failure_threshold=1, cooldown=0.05)
+    host.acquire()
+    host.release(0.1, ok=False)
+    time.sleep(0.06)
+
+    assert host.acquire()  # probe
+    with pytest.raises(CircuitOpenError):
+        host.acquire()
+    host.release(0.1, ok=True, probe=True)
+    assert host.state == CLOSED
+
+
+def test_late_request_does_not_free_probe_slot():
+    """Test request lama yang selesai saat half-open tidak membuka probe kedua"""
+    host = HostController("x", failure_threshold=1, cooldown=0.05)
+    assert not host.acquire()  # request lama, dimulai sebelum breaker terbuka
+    assert not host.acquire()
+    host.release(0.1, ok=False)
+    assert host.state == OPEN
+    time.sleep(0.06)
+
+    assert host.acquire()  # probe
+    host.release(0.1, ok=True)  # request lama selesai
+    assert host.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        host.acquire()
+    assert host.in_flight == 1
+
+    host.release(0.1, ok=False, probe=True)
+    assert host.state == OPEN
+
+
+def test_retry_after_blocks_new_requests():
+    host = HostController("x")
+    host.acquire()
+    host.release(0.01, ok=False, retry_after=0.2)
+    started = time.monotonic()
+    host.acquire()
+    assert time.monotonic() - started >= 0.15
+    # Throttling tidak dihitung sebagai kegagalan breaker
+    assert host.consecutive_failures == 0
+
+
+def test_fetch_page_honours_retry_after():
+    throttled = Mock(status_code=429, headers={"Retry-After": "0.1"}, text="")
+    throttled.raise_for_status.side_effect = HTTPError("429")
+    ok = Mock(status_code=200, headers={}, text="<html></html>")
+    controller = RateController()
+
+    with patch('utils.extract.requests.get', side_effect=[throttled, ok]) as mock_get:
+        assert fetch_page("http://x/page2", controller=controller) == "<html></html>"
+        assert mock_get.call_count == 2
+
+    metrics = controller.metrics()["x"]
+    assert metrics["throttled"] == 1
+    assert metrics["requests"] == 2
+
+
+def test_extract_skips_pages_when_breaker_open():
+    """Test halaman sisa dilewati cepat setelah circuit breaker terbuka"""
+    controller = RateController(failure_threshold=3, cooldown=60)
+    with patch('utils.extract.requests.get', side_effect=ConnectionError("down")) as mock_get:
+        df = extract_data(max_pages=20, rate_controller=controller)
+
+    assert df.empty
+    assert mock_get.call_count == 3
+    metrics = controller.metrics()["fashion-studio.dicoding.dev"]
+    assert metrics["state"] == OPEN
+    assert metrics["rejected"] == 17
+
+
+def test_adaptive_timeout_follows_latency():
+    host = HostController("x", min_timeout=2, max_timeout=30)
+    assert host.timeout(30) == 30
+    host.acquire()
+    host.release(0.5, ok=True)
+    assert host.timeout(30) == 3.0
+
+
+@patch('utils.extract.requests.get', side_effect=ValueError("respons rusak"))
+def test_unexpected_error_releases_host_slot(mock_get):
+    """Test slot host tetap dilepas jika request gagal dengan exception non-requests"""
+    controller = RateController(initial_limit=1, max_limit=1)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            fetch_page("https://fashion-studio.dicoding.dev", controller=controller)
+    metrics = controller.metrics()["fashion-studio.dicoding.dev"]
+    assert metrics["in_flight"] == 0
+    assert metrics["requests"] == 2
+
+
+def test_client_errors_do_not_open_breaker():
+    """Test 404 beruntun tidak membuka circuit breaker, 5xx tetap dihitung"""
+    controller = RateController(failure_threshold=2)
+    missing = Mock(status_code=404, headers={})
+    missing.raise_for_status.side_effect = HTTPError("404")
+    broken = Mock(status_code=500, headers={})
+    broken.raise_for_status.side_effect = HTTPError("500")
+
+    with patch('utils.extract.requests.get', return_value=missing):
+        for _ in range(5):
+            with pytest.raises(HTTPError):
+                fetch_page("https://fashion-studio.dicoding.dev/produk", controller=controller)
+    metrics = controller.metrics()["fashion-studio.dicoding.dev"]
+    assert metrics["state"] == CLOSED
+    assert metrics["errors"] == 5
+    assert metrics["consecutive_failures"] == 0
+
+    with patch('utils.extract.requests.get', return_value=broken):
+        for _ in range(2):
+            with pytest.raises(HTTPError):
+                fetch_page("https://fashion-studio.dicoding.dev", controller=controller)
+    assert controller.metrics()["fashion-studio.dicoding.dev"]["state"] == OPEN
+
+
+@patch('utils.extract.requests.get', side_effect=ConnectionError("putus"))
+def test_connection_errors_open_breaker(mock_get):
+    controller = RateController(failure_threshold=2)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            fetch_page("https://fashion-studio.dicoding.dev", controller=controller)
+    with pytest.raises(CircuitOpenError):
+        fetch_page("https://fashion-studio.dicoding.dev", controller=controller)
+
+
+def test_429_without_retry_after_reduces_limit():
+    """Test 429 tanpa Retry-After menurunkan limit tanpa membuka breaker"""
+    controller = RateController(initial_limit=8, max_limit=8, failure_threshold=2)
+    throttled = Mock(status_code=429, headers={})
+    throttled.raise_for_status.side_effect = HTTPError("429")
+
+    with patch('utils.extract.requests.get', return_value=throttled):
+        for _ in range(5):
+            with pytest.raises(HTTPError):
+                fetch_page("https://fashion-studio.dicoding.dev", controller=controller)
+    metrics = controller.metrics()["fashion-studio.dicoding.dev"]
+    assert metrics["limit"] == 1.0
+    assert metrics["throttled"] == 5
+    assert metrics["state"] == CLOSED
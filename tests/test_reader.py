@@ -0,0 +1,110 @@
+import os
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from utils.dedup import KeyIndex
+from utils.load import save_to_csv
+from utils.reader import iter_csv_chunks, read_transformed_csv, ReaderError
+
+
+def transformed_frame(titles):
+    return pd.DataFrame({
+        'Title': titles,
+        'Price': [160000.0 * (i + 1) for i in range(len(titles))],
+        'Rating': [4.5] * len(titles),
+        'Colors': pd.array([3] * len(titles), dtype='Int64'),
+        'Size': ['M'] * len(titles),
+        'Gender': ['Men'] * len(titles),
+        'scrape_timestamp': ['2025-05-25T13:09:32.643265+07:00'] * len(titles),
+    })
+
+
+def test_chunks_keep_declared_dtypes_and_strip_bom(tmp_path):
+    """Test file export dibaca per chunk dengan dtype yang dideklarasikan"""
+    path = tmp_path / "product.csv"
+    save_to_csv(transformed_frame([f"Item {i}" for i in range(5)]), str(path))
+    assert path.read_bytes().startswith(b'\xef\xbb\xbf')
+
+    chunks = list(iter_csv_chunks([str(path)], chunksize=2, key_columns=['Title']))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    first = chunks[0]
+    assert list(first.columns)[0] == 'Title'
+    assert first['Price'].dtype == 'float64'
+    assert str(first['Colors'].dtype) == 'Int64'
+
+
+def test_skip_rows_seen_in_earlier_exports(tmp_path):
+    """Test baris yang sudah ada di export sebelumnya tidak di-load ulang"""
+    old = tmp_path / "old.csv"
+    new = tmp_path / "new.csv"
+    save_to_csv(transformed_frame(["A", "B", "C"]), str(old))
+    save_to_csv(transformed_frame(["A", "B", "C", "D"]).iloc[[0, 3]], str(new))
+
+    chunks = list(iter_csv_chunks([str(old), str(new)], chunksize=10))
+    titles = [t for c in chunks for t in c['Title']]
+    assert titles == ["A", "B", "C", "D"]
+
+    chunks = list(iter_csv_chunks([str(old), str(new)], chunksize=10, skip_seen=False))
+    assert sum(len(c) for c in chunks) == 5
+
+
+def test_raw_schema_is_transformed_per_chunk(tmp_path):
+    path = tmp_path / "raw.csv"
+    pd.DataFrame({
+        'Title': ['Jacket', 'Unknown Product'],
+        'Price': ['10.00', '5.00'],
+        'Rating': ['Rating: 4.5 / 5', None],
+        'scrape_timestamp': ['2025-05-25T13:09:32+07:00'] * 2,
+    }).to_csv(path, index=False, encoding='utf-8-sig')
+
+    chunks = list(iter_csv_chunks([str(path)], chunksize=10, schema="raw"))
+    assert len(chunks) == 1
+    assert chunks[0]['Price'].iloc[0] == 160000.0
+    assert chunks[0]['Rating'].iloc[0] == 4.5
+
+
+def test_csv_append_roundtrip(tmp_path):
+    """Test append chunk ke CSV tanpa header/BOM ganda"""
+    path = tmp_path / "out.csv"
+    save_to_csv(transformed_frame(["A"]), str(path))
+    save_to_csv(transformed_frame(["B"]), str(path), append=True)
+    df = read_transformed_csv(str(path))
+    assert list(df['Title']) == ["A", "B"]
+
+
+@pytest.mark.parametrize("kwargs", [{"schema": "parquet"}, {"chunksize": 0}])
+def test_invalid_reader_arguments(tmp_path, kwargs):
+    with pytest.raises(ReaderError):
+        list(iter_csv_chunks([str(tmp_path / "x.csv")], **kwargs))
+
+
+def test_missing_file_raises_reader_error(tmp_path):
+    with pytest.raises(ReaderError):
+        list(iter_csv_chunks([str(tmp_path / "missing.csv")]))
+
+
+def test_bad_value_in_chunk_raises_reader_error(tmp_path):
+    """Test nilai tidak valid di tengah file dilaporkan dengan path dan nomor chunk"""
+    path = tmp_path / "product.csv"
+    df = transformed_frame(["A", "B", "C"]).astype({'Price': object})
+    df.loc[2, 'Price'] = 'abc'
+    df.to_csv(path, index=False)
+
+    chunks = iter_csv_chunks([str(path)], chunksize=2)
+    assert len(next(chunks)) == 2
+    with pytest.raises(ReaderError, match=r"chunk 2 dari .*product\.csv"):
+        next(chunks)
+
+
+def test_skip_seen_spills_to_temporary_index(tmp_path):
+    """Test index skip_seen tanpa key_index memakai file SQLite sementara"""
+    path = tmp_path / "product.csv"
+    save_to_csv(transformed_frame(["A", "B", "A"]), str(path))
+
+    with patch('utils.reader.KeyIndex', wraps=KeyIndex) as mock_index:
+        chunks = list(iter_csv_chunks([str(path)], chunksize=2, key_columns=['Title']))
+    assert [list(c['Title']) for c in chunks] == [["A", "B"]]
+    index_path = mock_index.call_args.kwargs['path']
+    assert index_path.endswith("seen.sqlite")
+    assert not os.path.exists(os.path.dirname(index_path))
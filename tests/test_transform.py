@@ -2,7 +2,13 @@ import pytest
 import pandas as pd
 import numpy as np
 from datetime import datetime, timezone
-from utils.transform import transform_data, validate_transformed_data, TransformationError
+from utils.transform import (
+    transform_data,
+    validate_transformed_data,
+    compact_frame,
+    memory_report,
+    TransformationError,
+)
 
 
 def test_valid_data_transformation():
@@ -121,3 +127,51 @@ def test_empty_data_validation():
     with pytest.raises(ValueError) as exc_info:
         validate_transformed_data(pd.DataFrame())
     assert "Data kosong" in str(exc_info.value)
+
+
+def test_compact_frame_dtypes_and_memory():
+    """Test skema compact: category, float32, Int8 dan timestamp tz-aware"""
+    raw = pd.DataFrame({
+        'Title': ['Jaket', 'Jaket', 'Celana', 'Jaket'],
+        'Price': ['10.0', '10.0', '20.0', '30.0'],
+        'Rating': ['Rating: 4.5 / 5'] * 4,
+        'Colors': [3, 3, 5, 5],
+        'Size': ['M', 'L', 'M', 'M'],
+        'Gender': ['Men', 'Women', 'Men', 'Men'],
+        'scrape_timestamp': [
+            '2025-05-25T13:09:32.643265+07:00',
+            '2025-05-25T13:09:33.000000+07:00',
+            '2025-05-25T06:09:34Z',
+            '2025-05-25T13:09:35+07:00',
+        ],
+    })
+    df = transform_data(raw)
+    compact = compact_frame(df)
+
+    for col in ['Title', 'Size', 'Gender']:
+        assert isinstance(compact[col].dtype, pd.CategoricalDtype)
+    assert compact['Price'].dtype == 'float32'
+    assert compact['Rating'].dtype == 'float32'
+    assert str(compact['Colors'].dtype) == 'Int8'
+    assert str(compact['scrape_timestamp'].dt.tz) == 'Asia/Jakarta'
+    assert compact['scrape_timestamp'].iloc[2].isoformat() == '2025-05-25T13:09:34+07:00'
+
+    assert memory_report(compact)['bytes_per_row'] < memory_report(df)['bytes_per_row']
+    # Validasi tetap berjalan pada skema compact
+    assert validate_transformed_data(compact)['total_rows'] == 4
+
+
+def test_compact_frame_keeps_unique_titles_as_object():
+    df = pd.DataFrame({'Title': ['A', 'B', 'C'], 'Size': ['M', 'M', 'M']})
+    compact = compact_frame(df)
+    assert compact['Title'].dtype == object
+    assert isinstance(compact['Size'].dtype, pd.CategoricalDtype)
+
+
+def test_compact_frame_keeps_large_prices_exact():
+    """Test harga di atas 2^24 (IDR) tidak dibulatkan oleh float32"""
+    df = pd.DataFrame({'Price': [20000001.0, 160000.0], 'Rating': [4.8, 3.9]})
+    compact = compact_frame(df)
+    assert compact['Price'].dtype == 'float64'
+    assert compact['Price'].tolist() == [20000001.0, 160000.0]
+    assert compact['Rating'].dtype == 'float32'
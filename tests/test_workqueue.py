@@ -0,0 +1,198 @@
+import os
+import re
+import time
+import pytest
+from unittest.mock import patch, Mock
+from requests.exceptions import Timeout
+
+from utils.ratelimit import merge_metrics
+from utils.workqueue import WorkQueue, QueueError, run_worker, crawl_sharded, worker_main
+
+
+def listing_html(site, page):
+    return f"""
+    <div class="collection-card">
+        <h3 class="product-title">{site} Product {page}</h3>
+        <span class="price">$10.00</span>
+    </div>
+    """
+
+
+def fake_get(url, *args, **kwargs):
+    m = re.match(r"https?://([^/]+)(?:/page(\d+))?$", url)
+    page = int(m.group(2)) if m.group(2) else 1
+    return Mock(text=listing_html(m.group(1), page), raise_for_status=Mock())
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = WorkQueue(str(tmp_path / "queue.sqlite"), lease_seconds=60, max_attempts=2)
+    yield q
+    q.close()
+
+
+def test_enqueue_ignores_duplicate_jobs(queue):
+    assert queue.enqueue("http://a", range(1, 4)) == 3
+    assert queue.enqueue("http://a", range(1, 6)) == 2
+    assert queue.counts() == {"pending": 5}
+
+
+def test_claim_is_exclusive_until_lease_expires(queue):
+    """Test job yang di-lease tidak diambil worker lain sampai lease habis"""
+    queue.enqueue("http://a", [1])
+    assert queue.claim("w1") == ("http://a", 1)
+    assert queue.claim("w2") is None
+
+    queue._conn.execute("UPDATE jobs SET leased_until = ?", (time.time() - 1,))
+    # Worker w1 dianggap mati, job kembali tersedia (at-least-once)
+    assert queue.claim("w2") == ("http://a", 1)
+
+
+def test_fail_retries_then_marks_failed(queue):
+    queue.enqueue("http://a", [1])
+    queue.claim("w1")
+    queue.fail("http://a", 1, "timeout", "w1")
+    assert queue.counts() == {"pending": 1}
+    queue.claim("w1")
+    queue.fail("http://a", 1, "timeout", "w1")
+    assert queue.counts() == {"failed": 1}
+    assert queue.unfinished() == 0
+
+
+def test_complete_twice_does_not_duplicate_results(queue):
+    queue.enqueue("http://a", [1])
+    products = [{"Title": "A", "Price": "1.00"}]
+    for _ in range(2):
+        queue._conn.execute("UPDATE jobs SET status = 'pending'")
+        queue.claim("w1")
+        assert queue.complete("http://a", 1, products, "w1")
+    assert queue.collect() == products
+
+
+def test_expired_lease_cannot_overwrite_other_worker(queue):
+    """Test worker dengan lease kedaluwarsa tidak mengubah job milik worker lain"""
+    queue.enqueue("http://a", [1])
+    queue.claim("w1")
+    queue._conn.execute("UPDATE jobs SET leased_until = ?", (time.time() - 1,))
+    queue.claim("w2")
+    assert queue.complete("http://a", 1, [{"Title": "B"}], "w2")
+
+    assert not queue.fail("http://a", 1, "timeout", "w1")
+    assert not queue.complete("http://a", 1, [{"Title": "A"}], "w1")
+    assert queue.counts() == {"done": 1}
+    assert queue.collect() == [{"Title": "B"}]
+
+
+def test_run_worker_drains_queue(tmp_path):
+    db = str(tmp_path / "queue.sqlite")
+    q = WorkQueue(db)
+    q.enqueue("http://a", range(1, 4))
+    q.close()
+
+    with patch('utils.extract.requests.get', side_effect=fake_get):
+        assert run_worker(db, worker="test") == 3
+
+    q = WorkQueue(db)
+    assert q.counts() == {"done": 3}
+    assert [p["Title"] for p in q.collect()] == [f"a Product {i}" for i in range(1, 4)]
+    q.close()
+
+
+def test_run_worker_requeues_failed_page(tmp_path):
+    db = str(tmp_path / "queue.sqlite")
+    q = WorkQueue(db)
+    q.enqueue("http://a", [1])
+    q.close()
+    responses = iter([Timeout("timeout"), None])
+
+    def flaky_get(url, *args, **kwargs):
+        error = next(responses)
+        if error:
+            raise error
+        return fake_get(url)
+
+    with patch('utils.extract.requests.get', side_effect=flaky_get):
+        assert run_worker(db, worker="test") == 1
+
+
+def test_crawl_sharded_merges_sites_in_process(tmp_path):
+    """Test koordinator menggabungkan hasil beberapa site"""
+    with patch('utils.extract.requests.get', side_effect=fake_get):
+        df = crawl_sharded(
+            ["http://a", "http://b/"], 2, str(tmp_path / "q.sqlite"), num_workers=0
+        )
+
+    assert list(df["Title"]) == [
+        "a Product 1", "a Product 2", "b Product 1", "b Product 2"
+    ]
+    assert set(df.columns) >= {"Title", "Price", "scrape_timestamp"}
+
+
+def test_crawl_sharded_with_worker_processes(tmp_path):
+    """Test crawl dengan beberapa proses worker"""
+    with patch('utils.extract.requests.get', side_effect=fake_get):
+        df = crawl_sharded(["http://a"], 6, str(tmp_path / "q.sqlite"), num_workers=3)
+
+    assert list(df["Title"]) == [f"a Product {i}" for i in range(1, 7)]
+
+
+def test_crawl_sharded_resume_skips_done_pages(tmp_path):
+    db = str(tmp_path / "q.sqlite")
+    with patch('utils.extract.requests.get', side_effect=fake_get):
+        crawl_sharded(["http://a"], 2, db, num_workers=0)
+    with patch('utils.extract.requests.get', side_effect=fake_get) as mock_get:
+        df = crawl_sharded(["http://a"], 3, db, num_workers=0, reset=False)
+        assert mock_get.call_count == 1
+    assert len(df) == 3
+
+
+def crashing_worker(db_path, **kwargs):
+    os._exit(3)
+
+
+@patch('utils.workqueue.run_worker', side_effect=crashing_worker)
+def test_crawl_sharded_fails_when_worker_crashes(mock_worker, tmp_path):
+    with pytest.raises(QueueError, match="exit code"):
+        crawl_sharded(["http://a"], 2, str(tmp_path / "q.sqlite"), num_workers=2)
+
+
+@patch('utils.workqueue.run_worker', return_value=0)
+def test_crawl_sharded_fails_with_unfinished_jobs(mock_worker, tmp_path):
+    """Test hasil parsial tidak dikembalikan sebagai extract yang berhasil"""
+    with pytest.raises(QueueError, match="2 job belum selesai"):
+        crawl_sharded(["http://a"], 2, str(tmp_path / "q.sqlite"), num_workers=0)
+
+
+def test_crawl_sharded_reports_worker_rate_control(tmp_path):
+    """Test statistik rate control tiap worker dikembalikan lewat queue"""
+    metrics = {}
+    with patch('utils.extract.requests.get', side_effect=fake_get):
+        crawl_sharded(
+            ["http://a"], 4, str(tmp_path / "q.sqlite"), num_workers=2,
+            rate_control={"initial_limit": 2}, metrics=metrics,
+        )
+
+    workers = metrics["workers"]
+    assert len(workers) == 2
+    assert sum(stats["pages"] for stats in workers.values()) == 4
+    merged = merge_metrics({w: stats["rate_control"] for w, stats in workers.items()})
+    assert merged["a"]["requests"] == 4
+    assert set(merged["a"]["sources"]) <= set(workers)
+
+
+@patch('utils.workqueue.run_worker', return_value=0)
+def test_worker_cli_passes_rate_control_and_lease(mock_worker):
+    """Test worker CLI memakai pengaturan yang sama dengan crawl_sharded"""
+    worker_main([
+        "q.sqlite", "--lease-seconds", "120", "--max-attempts", "5",
+        "--workers", "2", "--max-limit", "8", "--breaker-failures", "3",
+    ])
+    kwargs = mock_worker.call_args.kwargs
+    assert kwargs["lease_seconds"] == 120
+    assert kwargs["max_attempts"] == 5
+    assert kwargs["rate_control"] == {
+        "initial_limit": 2, "max_limit": 8, "failure_threshold": 3, "cooldown": 30.0,
+    }
+
+    worker_main(["q.sqlite", "--no-rate-control"])
+    assert mock_worker.call_args.kwargs["rate_control"] is None
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class ResponseCache:
+    """URL-keyed cache for fetched pages with a TTL.
+
+    Without ``cache_dir``, entries are kept in memory as an LRU of at most
+    ``max_entries`` pages. With ``cache_dir``, page bodies live only on disk
+    so later runs can reuse them until they expire; memory then holds just
+    the fetch time of recently used URLs, so a long crawl does not keep the
+    whole catalogue in RAM.
+    """
+
+    def __init__(self, ttl: float = 3600, cache_dir: Optional[str] = None, max_entries: int = 1024):
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # url -> (fetched_at, text); text None jika isinya hanya ada di disk
+        self._entries: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _expired(self, fetched_at: float) -> bool:
+        return self.ttl is not None and time.time() - fetched_at > self.ttl
+
+    def _read(self, url: str) -> Optional[Tuple[float, str]]:
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                stored = json.load(f)
+            return stored["fetched_at"], stored["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _remember(self, url: str, entry: Tuple[float, Optional[str]]) -> None:
+        # Dipanggil dengan self._lock terkunci
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, url: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(url)
+        if (entry is None or entry[1] is None) and self.cache_dir:
+            if entry is None or not self._expired(entry[0]):
+                entry = self._read(url)
+
+        with self._lock:
+            if entry is None or entry[1] is None or self._expired(entry[0]):
+                self._entries.pop(url, None)
+                self.misses += 1
+                return None
+            self._remember(url, (entry[0], None) if self.cache_dir else entry)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, url: str, text: str) -> None:
+        entry = (time.time(), text)
+        stored_on_disk = False
+        if self.cache_dir:
+            try:
+                with open(self._path(url), "w", encoding="utf-8") as f:
+                    json.dump({"url": url, "fetched_at": entry[0], "text": text}, f)
+                stored_on_disk = True
+            except OSError as e:
+                logging.warning("Gagal menulis cache untuk %s: %s", url, e)
+        with self._lock:
+            self._remember(url, (entry[0], None) if stored_on_disk else entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
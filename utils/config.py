@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+STAGES = ["extract", "transform", "validate", "load"]
+SINKS = ["csv", "pg", "sheets"]
+
+DEFAULTS: Dict[str, Any] = {
+    # Stage selection
+    "stages": list(STAGES),
+    "sinks": list(SINKS),
+    # Extract
+    "sites": ["https://fashion-studio.dicoding.dev"],
+    "max_pages": 50,
+    "workers": 1,
+    "cache_dir": None,
+    "cache_ttl": 3600.0,
+    "rate_control": True,
+    "breaker_failures": 5,
+    "breaker_cooldown": 30.0,
+    "enrich": False,
+    "enrich_workers": 8,
+    # Sharded crawl (0 = tanpa proses worker/queue)
+    "shard_workers": 0,
+    "queue_db": "crawl_queue.sqlite",
+    "queue_resume": False,
+    # Intermediate files
+    "raw_input": None,
+    "raw_output": None,
+    "transformed_input": None,
+    # Backfill dari export CSV lama (dibaca per chunk)
+    "backfill_inputs": [],
+    "backfill_schema": "transformed",
+    "read_chunk_size": 50000,
+    # Dedup lintas run: key bisnis (kosong = seluruh kolom kecuali
+    # scrape_timestamp) dan path index
+    "dedup_key": ["Title", "Price", "Colors", "Size", "Gender"],
+    "dedup_index": None,
+    # Skema output hemat memori (category, float32, datetime tz-aware)
+    "compact": False,
+    # Eksekusi stage sebagai DAG: jumlah thread dan cache output stage di disk
+    "dag_workers": 4,
+    "stage_cache_dir": None,
+    # Load targets
+    "csv_path": "product.csv",
+    "pg_conn": "postgresql://postgres:<your_password>@localhost:5432/fashion_db",
+    "pg_table": "products",
+    "chunk_size": None,
+    "sheet_id": "1jq8ltXsjPSibt2uVLrdGxgjqQ5dextWFQoXIFUYnbOw",
+    "sheet_range": "Sheet1!A1",
+    "creds_path": "sheet-api-key.json",
+}
+
+# Tipe nilai untuk key yang default-nya None
+_TYPES = {
+    "cache_dir": str,
+    "raw_input": str,
+    "raw_output": str,
+    "transformed_input": str,
+    "chunk_size": int,
+    "dedup_index": str,
+    "stage_cache_dir": str,
+}
+
+ENV_PREFIX = "ETL_"
+
+
+class ConfigError(Exception):
+    """Custom exception for invalid pipeline configuration."""
+    pass
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "on"):
+        return True
+    if text in ("0", "false", "no", "off", ""):
+        return False
+    raise ValueError(value)
+
+
+def _coerce(key: str, value: Any) -> Any:
+    if value is None:
+        return None
+    default = DEFAULTS[key]
+    try:
+        if isinstance(default, list):
+            if isinstance(value, str):
+                value = value.split(",")
+            return [str(v).strip() for v in value if str(v).strip()]
+        if isinstance(default, bool):
+            return _parse_bool(value)
+        kind = _TYPES.get(key, type(default))
+        return kind(value)
+    except (TypeError, ValueError) as e:
+        raise ConfigError(f"Nilai tidak valid untuk '{key}': {value!r}") from e
+
+
+def load_config_file(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Gagal membaca file konfigurasi {path}: {e}") from e
+
+    if not isinstance(data, dict):
+        raise ConfigError("File konfigurasi harus berisi objek JSON")
+    unknown = set(data) - set(DEFAULTS)
+    if unknown:
+        raise ConfigError(f"Key konfigurasi tidak dikenal: {sorted(unknown)}")
+    return data
+
+
+def load_env(environ: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    environ = os.environ if environ is None else environ
+    values = {}
+    for key in DEFAULTS:
+        env_key = ENV_PREFIX + key.upper()
+        if env_key in environ:
+            values[key] = environ[env_key]
+    return values
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="ETL pipeline Fashion Studio: extract, transform, validate, load."
+    )
+    parser.add_argument("--config", help="Path file konfigurasi JSON")
+    parser.add_argument(
+        "--stages",
+        help=f"Stage yang dijalankan, dipisah koma ({','.join(STAGES)})",
+    )
+    parser.add_argument(
+        "--sinks",
+        help=f"Target load, dipisah koma ({','.join(SINKS)})",
+    )
+    parser.add_argument("--sites", help="URL katalog sumber, dipisah koma")
+    parser.add_argument("--max-pages", dest="max_pages", type=int)
+    parser.add_argument("--workers", type=int, help="Jumlah request halaman paralel")
+    parser.add_argument("--cache-dir", dest="cache_dir", help="Direktori cache halaman")
+    parser.add_argument("--cache-ttl", dest="cache_ttl", type=float, help="TTL cache (detik)")
+    parser.add_argument(
+        "--no-rate-control", dest="rate_control", action="store_false", default=None,
+        help="Matikan rate limiter adaptif dan circuit breaker",
+    )
+    parser.add_argument(
+        "--breaker-failures", dest="breaker_failures", type=int,
+        help="Jumlah kegagalan beruntun sebelum circuit breaker terbuka",
+    )
+    parser.add_argument(
+        "--breaker-cooldown", dest="breaker_cooldown", type=float,
+        help="Lama circuit breaker terbuka sebelum mencoba lagi (detik)",
+    )
+    parser.add_argument(
+        "--enrich", action="store_true", default=None,
+        help="Ambil atribut tambahan dari halaman detail produk",
+    )
+    parser.add_argument(
+        "--enrich-workers", dest="enrich_workers", type=int,
+        help="Jumlah request halaman detail paralel",
+    )
+    parser.add_argument(
+        "--shard-workers", dest="shard_workers", type=int,
+        help="Jumlah proses worker crawl lewat queue SQLite (0 = nonaktif)",
+    )
+    parser.add_argument("--queue-db", dest="queue_db", help="Path database queue crawl")
+    parser.add_argument(
+        "--queue-resume", dest="queue_resume", action="store_true", default=None,
+        help="Lanjutkan queue yang sudah ada alih-alih memulai ulang",
+    )
+    parser.add_argument("--raw-input", dest="raw_input", help="CSV hasil extract sebagai input")
+    parser.add_argument("--raw-output", dest="raw_output", help="Simpan hasil extract ke CSV")
+    parser.add_argument(
+        "--transformed-input", dest="transformed_input",
+        help="CSV hasil transform sebagai input load",
+    )
+    parser.add_argument(
+        "--backfill", dest="backfill_inputs",
+        help="CSV export lama (dipisah koma) yang dibaca per chunk lalu di-load",
+    )
+    parser.add_argument(
+        "--backfill-schema", dest="backfill_schema", choices=["transformed", "raw"],
+        help="Format file backfill: hasil transform (product.csv) atau hasil extract",
+    )
+    parser.add_argument(
+        "--read-chunk-size", dest="read_chunk_size", type=int,
+        help="Jumlah baris per chunk saat membaca file backfill",
+    )
+    parser.add_argument(
+        "--dedup-key", dest="dedup_key",
+        help="Kolom key bisnis untuk dedup, dipisah koma (default: Title,Price,Colors,Size,Gender)",
+    )
+    parser.add_argument(
+        "--dedup-index", dest="dedup_index",
+        help="Path index dedup persisten; hanya baris baru yang di-load (append)",
+    )
+    parser.add_argument(
+        "--compact", action="store_true", default=None,
+        help="Gunakan skema hemat memori untuk data hasil transform",
+    )
+    parser.add_argument(
+        "--dag-workers", dest="dag_workers", type=int,
+        help="Jumlah stage yang boleh berjalan paralel (misalnya load ke beberapa sink)",
+    )
+    parser.add_argument(
+        "--stage-cache-dir", dest="stage_cache_dir",
+        help="Direktori cache output stage; stage dengan input sama tidak dijalankan ulang",
+    )
+    parser.add_argument("--csv-path", dest="csv_path")
+    parser.add_argument("--pg-conn", dest="pg_conn")
+    parser.add_argument("--pg-table", dest="pg_table")
+    parser.add_argument("--chunk-size", dest="chunk_size", type=int, help="Ukuran batch insert SQL")
+    parser.add_argument("--sheet-id", dest="sheet_id")
+    parser.add_argument("--sheet-range", dest="sheet_range")
+    parser.add_argument("--creds-path", dest="creds_path")
+    return parser
+
+
+def _check_backfill_output(inputs: List[str], csv_path: str) -> None:
+    """
+    Backfill membaca input lewat memory map sambil sink CSV menulis; jika
+    keduanya file yang sama, file terpotong saat chunk pertama ditulis.
+    """
+    if not os.path.exists(csv_path):
+        return
+    for path in inputs:
+        if os.path.exists(path) and os.path.samefile(path, csv_path):
+            raise ConfigError(
+                f"csv_path {csv_path} sama dengan input backfill {path}; "
+                "gunakan --csv-path lain"
+            )
+
+
+def validate_config(config: Dict[str, Any]) -> None:
+    stages: List[str] = config["stages"]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise ConfigError(f"Stage tidak dikenal: {unknown}")
+    unknown = [s for s in config["sinks"] if s not in SINKS]
+    if unknown:
+        raise ConfigError(f"Sink tidak dikenal: {unknown}")
+    if "load" in stages and not config["sinks"]:
+        raise ConfigError("Stage load membutuhkan minimal satu sink")
+    if config["workers"] < 1 or config["enrich_workers"] < 1:
+        raise ConfigError("workers dan enrich_workers minimal 1")
+    if config["breaker_failures"] < 1:
+        raise ConfigError("breaker_failures minimal 1")
+    if config["dag_workers"] < 1:
+        raise ConfigError("dag_workers minimal 1")
+    if config["shard_workers"] < 0:
+        raise ConfigError("shard_workers tidak boleh negatif")
+    if not config["sites"]:
+        raise ConfigError("sites tidak boleh kosong")
+    if config["chunk_size"] is not None and config["chunk_size"] < 1:
+        raise ConfigError("chunk_size minimal 1")
+    if config["read_chunk_size"] < 1:
+        raise ConfigError("read_chunk_size minimal 1")
+    if config["backfill_schema"] not in ("transformed", "raw"):
+        raise ConfigError(f"backfill_schema tidak dikenal: {config['backfill_schema']}")
+    if config["backfill_inputs"]:
+        if "load" in stages and "csv" in config["sinks"]:
+            _check_backfill_output(config["backfill_inputs"], config["csv_path"])
+        # Backfill tidak memakai extract/transform/raw_input
+        return
+
+    if "transform" in stages and "extract" not in stages and not config["raw_input"]:
+        raise ConfigError("Stage transform tanpa extract membutuhkan raw_input")
+    downstream = "validate" in stages or "load" in stages
+    if downstream and "transform" not in stages and not config["transformed_input"]:
+        raise ConfigError("Stage validate/load tanpa transform membutuhkan transformed_input")
+
+
+def load_config(
+    argv: Optional[List[str]] = None,
+    environ: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Resolve pipeline configuration. Later sources override earlier ones:
+      defaults → config file (--config / ETL_CONFIG) → ETL_* env vars → CLI args
+    """
+    args = build_parser().parse_args(argv)
+    environ = os.environ if environ is None else environ
+
+    config = {key: (list(v) if isinstance(v, list) else v) for key, v in DEFAULTS.items()}
+    config_path = args.config or environ.get(ENV_PREFIX + "CONFIG")
+    layers = []
+    if config_path:
+        layers.append(load_config_file(config_path))
+    layers.append(load_env(environ))
+    layers.append({k: v for k, v in vars(args).items() if k != "config" and v is not None})
+
+    for layer in layers:
+        for key, value in layer.items():
+            config[key] = _coerce(key, value)
+
+    validate_config(config)
+    return config
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+RAN = "ran"
+CACHED = "cached"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class DagError(Exception):
+    """Custom exception for pipeline graph and stage errors in ETL pipeline."""
+    pass
+
+
+def fingerprint(value: Any, ignore_columns: Sequence[str] = ()) -> str:
+    """
+    Hash isi output stage. DataFrame di-hash per baris dengan
+    hash_pandas_object (termasuk nama kolom dan dtype); nilai lain lewat pickle.
+    """
+    digest = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        frame = value.drop(columns=[c for c in ignore_columns if c in value.columns])
+        digest.update(repr([(str(c), str(t)) for c, t in frame.dtypes.items()]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+class Node:
+    """One stage of the pipeline: a callable plus the names of its inputs."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        inputs: Sequence[str] = (),
+        params: Optional[Dict[str, Any]] = None,
+        cache: bool = True,
+        volatile_columns: Sequence[str] = (),
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = params or {}
+        self.cache = cache
+        self.volatile_columns = tuple(volatile_columns)
+
+
+class Dag:
+    """
+    Small DAG executor for pipeline stages.
+
+    Each node is called with the outputs of its ``inputs`` as positional
+    arguments, in the declared order. A node starts as soon as all of its
+    inputs have finished, so independent nodes (for example the load
+    sinks) run in parallel on a thread pool of ``max_workers``.
+
+    With ``cache_dir``, the output of every node with ``cache=True`` is
+    pickled to disk under a key built from the node name, its ``params``
+    and the fingerprints of its inputs. A later run whose inputs hash the
+    same returns the stored output without calling the node. Columns in
+    ``volatile_columns`` (such as scrape timestamps) are left out of a
+    node's output fingerprint, so they alone do not invalidate the stages
+    downstream.
+
+    A node that raises is marked failed and every node depending on it is
+    skipped; nodes on other branches still run. Callbacks registered with
+    on_finish() run after every run, also when nodes failed, to release
+    resources that nodes opened.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_workers: int = 4):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.nodes: Dict[str, Node] = {}
+        self.report: Dict[str, Dict[str, Any]] = {}
+        self._finishers: List[Callable[[], None]] = []
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def add(self, name: str, func: Callable[..., Any], inputs: Sequence[str] = (), **options) -> Node:
+        if name in self.nodes:
+            raise DagError(f"Node sudah ada: {name}")
+        node = Node(name, func, inputs, **options)
+        self.nodes[name] = node
+        return node
+
+    def on_finish(self, func: Callable[[], None]) -> None:
+        self._finishers.append(func)
+
+    def order(self) -> List[str]:
+        """Urutan topologis node; gagal jika ada input tidak dikenal atau siklus."""
+        for node in self.nodes.values():
+            unknown = [i for i in node.inputs if i not in self.nodes]
+            if unknown:
+                raise DagError(f"Input tidak dikenal untuk node {node.name}: {unknown}")
+
+        ordered: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise DagError(f"Siklus pada graph: {' -> '.join(path + (name,))}")
+            state[name] = 1
+            for dep in self.nodes[name].inputs:
+                visit(dep, path + (name,))
+            state[name] = 2
+            ordered.append(name)
+
+        for name in self.nodes:
+            visit(name, ())
+        return ordered
+
+    def _cache_key(self, node: Node, input_prints: Iterable[str]) -> str:
+        payload = json.dumps(
+            {"node": node.name, "params": node.params, "inputs": list(input_prints)},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cache_path(self, node: Node, key: str) -> str:
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in node.name)
+        return os.path.join(self.cache_dir, f"{safe}-{key[:32]}.pkl")
+
+    def _load_cached(self, path: str) -> Optional[Tuple[Any, str]]:
+        try:
+            with open(path, "rb") as f:
+                stored = pickle.load(f)
+            return stored["value"], stored["fingerprint"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            return None
+
+    def _store(self, node: Node, path: str, value: Any, output_print: str) -> None:
+        prefix = os.path.basename(path).rsplit("-", 1)[0] + "-"
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    {"value": value, "fingerprint": output_print}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, path)
+            # Simpan hanya output terbaru per node supaya cache tidak terus membesar
+            for entry in os.listdir(self.cache_dir):
+                old = os.path.join(self.cache_dir, entry)
+                if entry.startswith(prefix) and entry.endswith(".pkl") and old != path:
+                    os.remove(old)
+        except (OSError, pickle.PicklingError) as e:
+            logging.warning("Gagal menyimpan cache node %s: %s", node.name, e)
+
+    def _execute(self, node: Node, args: List[Any], input_prints: List[str]) -> Tuple[Any, str, str]:
+        path = None
+        if self.cache_dir and node.cache:
+            path = self._cache_path(node, self._cache_key(node, input_prints))
+            cached = self._load_cached(path)
+            if cached is not None:
+                return cached[0], cached[1], CACHED
+
+        value = node.func(*args)
+        output_print = fingerprint(value, node.volatile_columns)
+        if path is not None:
+            self._store(node, path, value, output_print)
+        return value, output_print, RAN
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Jalankan semua node. Mengembalikan output per node yang berhasil;
+        status dan durasi tiap node tersedia di self.report.
+        """
+        order = self.order()
+        try:
+            return self._run(order)
+        finally:
+            for func in self._finishers:
+                try:
+                    func()
+                except Exception as e:
+                    logging.error("Gagal menjalankan on_finish: %s", e)
+
+    def _run(self, order: List[str]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        prints: Dict[str, str] = {}
+        self.report = {}
+        started: Dict[Any, Tuple[str, float]] = {}
+        waiting = list(order)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while waiting or started:
+                for name in list(waiting):
+                    node = self.nodes[name]
+                    statuses = [self.report.get(dep, {}).get("status") for dep in node.inputs]
+                    if any(s in (FAILED, SKIPPED) for s in statuses):
+                        waiting.remove(name)
+                        self.report[name] = {"status": SKIPPED, "seconds": 0.0}
+                        logging.warning("Node %s dilewati karena input gagal", name)
+                    elif all(s in (RAN, CACHED) for s in statuses):
+                        waiting.remove(name)
+                        args = [results[dep] for dep in node.inputs]
+                        input_prints = [prints[dep] for dep in node.inputs]
+                        future = executor.submit(self._execute, node, args, input_prints)
+                        started[future] = (name, time.monotonic())
+
+                if not started:
+                    continue
+                done, _ = wait(started, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, start = started.pop(future)
+                    seconds = round(time.monotonic() - start, 3)
+                    try:
+                        value, output_print, status = future.result()
+                    except Exception as e:
+                        self.report[name] = {"status": FAILED, "seconds": seconds, "error": str(e)}
+                        logging.error("Node %s gagal: %s", name, e)
+                        continue
+                    results[name] = value
+                    prints[name] = output_print
+                    self.report[name] = {"status": status, "seconds": seconds}
+                    logging.info("Node %s selesai (%s, %.3f detik)", name, status, seconds)
+
+        return results
+
+    def ok(self) -> bool:
+        return all(entry["status"] in (RAN, CACHED) for entry in self.report.values())
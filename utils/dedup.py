@@ -0,0 +1,245 @@
+import logging
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Dua hash 64-bit dengan key berbeda membentuk satu key 128-bit per baris
+_HASH_KEYS = ("etl-dedup-key-01", "etl-dedup-key-02")
+
+# Kolom yang berubah di setiap scraping dan tidak pernah menjadi bagian key
+# default KeyIndex
+VOLATILE_COLUMNS = ("scrape_timestamp",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS keys (
+    h1 INTEGER NOT NULL,
+    h2 INTEGER NOT NULL,
+    PRIMARY KEY (h1, h2)
+) WITHOUT ROWID;
+CREATE TEMP TABLE IF NOT EXISTS staged (
+    h1 INTEGER NOT NULL,
+    h2 INTEGER NOT NULL,
+    PRIMARY KEY (h1, h2)
+) WITHOUT ROWID;
+"""
+
+
+class DedupError(Exception):
+    """Custom exception for duplicate detection errors in ETL pipeline."""
+    pass
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Samakan representasi kolom sebelum di-hash supaya skema default dan
+    compact menghasilkan key yang sama. Nilai float64 di-hash dengan presisi
+    penuh; float32 dinaikkan ke float64 lewat repr terpendeknya (4.8 tetap
+    4.8), integer menjadi Int64, dan category/datetime tz-aware menjadi teks.
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            df[col] = df[col].map(lambda t: t.isoformat() if pd.notna(t) else None)
+        elif dtype == np.float32:
+            df[col] = pd.to_numeric(df[col].astype(str)).astype("float64")
+        elif pd.api.types.is_integer_dtype(dtype):
+            df[col] = df[col].astype("Int64")
+        elif isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            df[col] = df[col].astype(object)
+    return df
+
+
+def hash_keys(df: pd.DataFrame, key_columns: Optional[Sequence[str]] = None) -> np.ndarray:
+    """Hash key bisnis tiap baris menjadi array uint64 berbentuk (n, 2)."""
+    cols = list(key_columns) if key_columns else list(df.columns)
+    missing = [col for col in cols if col not in df.columns]
+    if missing:
+        raise DedupError(f"Kolom key tidak ditemukan: {missing}")
+
+    frame = _normalize(df[cols])
+    hashes = np.empty((len(frame), 2), dtype=np.uint64)
+    for i, hash_key in enumerate(_HASH_KEYS):
+        hashes[:, i] = pd.util.hash_pandas_object(
+            frame, index=False, hash_key=hash_key
+        ).to_numpy()
+    return hashes
+
+
+def _first_occurrence(hashes: np.ndarray) -> np.ndarray:
+    """Mask baris yang key-nya muncul pertama kali di dalam batch ini."""
+    mask = np.zeros(len(hashes), dtype=bool)
+    if len(hashes):
+        _, first = np.unique(hashes, axis=0, return_index=True)
+        mask[first] = True
+    return mask
+
+
+def duplicate_mask(df: pd.DataFrame, key_columns: Optional[Sequence[str]] = None) -> pd.Series:
+    """Setara df.duplicated(subset=key_columns), berbasis hash 128-bit."""
+    mask = ~_first_occurrence(hash_keys(df, key_columns))
+    return pd.Series(mask, index=df.index)
+
+
+class KeyIndex:
+    """
+    Set of 128-bit row-key hashes that stays usable across chunks and runs.
+
+    Keys are kept as two sorted uint64 arrays, 16 bytes per unique key, with
+    no per-object overhead. When ``path`` is given, keys are spilled to a
+    temporary staging table once more than ``max_memory_keys`` are held, so
+    memory stays bounded. Only close(commit=True) merges the new keys into
+    the persistent ``keys`` table; close(commit=False) discards them even
+    after a spill. The next run with the same path then skips exactly the
+    rows that were committed.
+
+    Without ``key_columns`` the key is every column except
+    VOLATILE_COLUMNS, so the same product scraped again later still
+    matches.
+
+    Counts are exact unless two different keys share a 128-bit hash.
+    ``stats()`` reports an upper bound for that probability.
+    """
+
+    def __init__(
+        self,
+        key_columns: Optional[Sequence[str]] = None,
+        path: Optional[str] = None,
+        max_memory_keys: int = 1_000_000,
+    ):
+        self.key_columns: Optional[List[str]] = list(key_columns) if key_columns else None
+        self.path = path
+        self.max_memory_keys = max_memory_keys
+        self.rows_seen = 0
+        self.duplicates = 0
+        self._h1 = np.empty(0, dtype=np.uint64)
+        self._h2 = np.empty(0, dtype=np.uint64)
+        self._disk_keys = 0
+        self._conn = None
+        if path:
+            try:
+                # Index bisa dibuka dan di-commit oleh thread berbeda (node DAG),
+                # tetapi tidak pernah dipakai dua thread sekaligus
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.executescript(_SCHEMA)
+                self._disk_keys = self._conn.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+            except sqlite3.Error as e:
+                raise DedupError(f"Gagal membuka index dedup {path}: {e}") from e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+    def __len__(self) -> int:
+        return len(self._h1) + self._disk_keys
+
+    def _in_memory(self, hashes: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(hashes), dtype=bool)
+        if not len(self._h1) or not len(hashes):
+            return found
+        q1, q2 = hashes[:, 0], hashes[:, 1]
+        left = np.searchsorted(self._h1, q1, side="left")
+        right = np.searchsorted(self._h1, q1, side="right")
+        single = right - left == 1
+        found[single] = self._h2[left[single]] == q2[single]
+        # h1 sama untuk beberapa key (sangat jarang): cek h2 dalam rentang tersebut
+        for i in np.flatnonzero(right - left > 1):
+            found[i] = q2[i] in self._h2[left[i]:right[i]]
+        return found
+
+    def _on_disk(self, hashes: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(hashes), dtype=bool)
+        if self._conn is None or not self._disk_keys or not len(hashes):
+            return found
+        signed = hashes.view(np.int64)
+        cur = self._conn.cursor()
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS batch (pos INTEGER, h1 INTEGER, h2 INTEGER)")
+        cur.execute("DELETE FROM batch")
+        cur.executemany(
+            "INSERT INTO batch VALUES (?, ?, ?)",
+            ((i, int(a), int(b)) for i, (a, b) in enumerate(signed)),
+        )
+        rows = cur.execute(
+            "SELECT pos FROM batch JOIN keys USING (h1, h2) "
+            "UNION SELECT pos FROM batch JOIN staged USING (h1, h2)"
+        ).fetchall()
+        cur.execute("DELETE FROM batch")
+        found[[pos for (pos,) in rows]] = True
+        return found
+
+    def _add(self, hashes: np.ndarray) -> None:
+        h1 = np.concatenate([self._h1, hashes[:, 0]])
+        h2 = np.concatenate([self._h2, hashes[:, 1]])
+        order = np.lexsort((h2, h1))
+        self._h1, self._h2 = h1[order], h2[order]
+        if self._conn is not None and len(self._h1) > self.max_memory_keys:
+            self.flush()
+
+    def mark_new(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Kembalikan mask baris yang key-nya belum pernah terlihat (termasuk
+        duplikat di dalam df itu sendiri) dan catat key baru ke index.
+        """
+        key_columns = self.key_columns or [c for c in df.columns if c not in VOLATILE_COLUMNS]
+        hashes = hash_keys(df, key_columns)
+        new = _first_occurrence(hashes)
+        candidates = np.flatnonzero(new)
+        seen = self._in_memory(hashes[candidates]) | self._on_disk(hashes[candidates])
+        new[candidates[seen]] = False
+
+        self._add(hashes[new])
+        self.rows_seen += len(df)
+        self.duplicates += int((~new).sum())
+        return new
+
+    def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df[self.mark_new(df)]
+
+    def flush(self) -> None:
+        """
+        Pindahkan key di memori ke tabel staging SQLite (tidak berlaku tanpa
+        path). Key staging baru permanen setelah close(commit=True).
+        """
+        if self._conn is None or not len(self._h1):
+            return
+        signed_h1 = self._h1.view(np.int64)
+        signed_h2 = self._h2.view(np.int64)
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO staged (h1, h2) VALUES (?, ?)",
+                zip(signed_h1.tolist(), signed_h2.tolist()),
+            )
+        self._disk_keys += len(self._h1)
+        logging.info("Index dedup: %d key dipindah ke staging %s", len(self._h1), self.path)
+        self._h1 = np.empty(0, dtype=np.uint64)
+        self._h2 = np.empty(0, dtype=np.uint64)
+
+    def close(self, commit: bool = True) -> None:
+        """
+        Tutup index. commit=True menyimpan semua key baru ke tabel keys;
+        commit=False membuangnya, termasuk yang sudah dipindah ke staging.
+        """
+        if self._conn is not None:
+            if commit:
+                self.flush()
+                with self._conn:
+                    self._conn.execute("INSERT OR IGNORE INTO keys SELECT h1, h2 FROM staged")
+                logging.info("Index dedup: %d key disimpan ke %s", len(self), self.path)
+            self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        unique = len(self)
+        return {
+            "rows_seen": self.rows_seen,
+            "unique_keys": unique,
+            "duplicates": self.duplicates,
+            "memory_bytes": int(self._h1.nbytes + self._h2.nbytes),
+            "disk_keys": self._disk_keys,
+            # Batas atas peluang ada dua key berbeda dengan hash 128-bit sama
+            "collision_probability": unique * (unique - 1) / 2 ** 129,
+        }
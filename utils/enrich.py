@@ -0,0 +1,141 @@
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable
+
+import pandas as pd
+
+from utils.extract import fetch_page
+from utils.lazy import lazy_attrs
+from utils.ratelimit import CircuitOpenError
+
+_lazy = lazy_attrs(globals(), {
+    "requests": ("requests", None),
+    "BeautifulSoup": ("bs4", "BeautifulSoup"),
+})
+__getattr__ = _lazy
+
+DETAIL_URL_COL = "detail_url"
+
+# Pasangan "Label: nilai" di halaman detail, contoh "Material: Cotton"
+_FIELD_PATTERN = re.compile(r"^\s*([A-Za-z][A-Za-z ]{0,40}?)\s*:\s*(.+?)\s*$")
+
+
+def parse_detail(html: str) -> Dict[str, str]:
+    """
+    Ambil atribut tambahan dari halaman detail produk:
+    deskripsi dan semua baris berformat "Label: nilai".
+    """
+    soup = _lazy("BeautifulSoup")(html, "html.parser")
+    fields = {}
+
+    description = soup.find(class_=re.compile(r"(product-)?description"))
+    if description:
+        fields["Description"] = description.get_text(" ", strip=True)
+
+    for tag in soup.find_all(["p", "li", "span"]):
+        text = tag.get_text(" ", strip=True)
+        match = _FIELD_PATTERN.match(text)
+        if match:
+            label = match.group(1).strip().title()
+            fields.setdefault(label, match.group(2))
+
+    return fields
+
+
+def fetch_details(
+    urls: Iterable[str],
+    max_workers: int = 8,
+    cache=None,
+    progress_every: int = 10,
+    rate_controller=None,
+) -> Dict[str, Dict[str, str]]:
+    """
+    Ambil halaman detail secara paralel. URL diduplikasi dulu sehingga setiap
+    halaman hanya diambil sekali; hasil dikembalikan per URL.
+    """
+    requests = _lazy("requests")
+    unique_urls = list(dict.fromkeys(u for u in urls if isinstance(u, str) and u))
+    total = len(unique_urls)
+    details = {}
+    if not total:
+        return details
+
+    logging.info(f"Mengambil {total} halaman detail dengan {max_workers} worker")
+    started = time.monotonic()
+    failed = 0
+
+    def task(url):
+        return parse_detail(fetch_page(url, cache=cache, controller=rate_controller))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(task, url): url for url in unique_urls}
+        for done, future in enumerate(as_completed(futures), start=1):
+            url = futures[future]
+            try:
+                details[url] = future.result()
+            except CircuitOpenError as e:
+                failed += 1
+                logging.warning(f"Detail {url} dilewati: {str(e)}")
+            except requests.RequestException as e:
+                failed += 1
+                logging.error(f"Gagal mengambil detail {url}: {str(e)}")
+            except Exception as e:
+                failed += 1
+                logging.error(f"Gagal parsing detail {url}: {str(e)}")
+
+            if done % progress_every == 0 or done == total:
+                elapsed = time.monotonic() - started
+                rate = done / elapsed if elapsed > 0 else float("inf")
+                logging.info(
+                    f"Progress detail: {done}/{total} ({rate:.1f} halaman/detik, gagal={failed})"
+                )
+
+    return details
+
+
+def enrich_products(
+    df: pd.DataFrame,
+    max_workers: int = 8,
+    cache=None,
+    progress_every: int = 10,
+    rate_controller=None,
+) -> pd.DataFrame:
+    """
+    Gabungkan atribut halaman detail ke DataFrame hasil extract_data().
+
+    df harus memiliki kolom 'detail_url' (extract_data(with_detail_urls=True)).
+    Kolom baru ditambahkan; kolom yang sudah ada hanya diisi jika nilainya kosong.
+    """
+    if df.empty or DETAIL_URL_COL not in df.columns:
+        logging.warning("Tidak ada kolom detail_url; enrichment dilewati")
+        return df
+
+    details = fetch_details(
+        df[DETAIL_URL_COL].dropna().unique(),
+        max_workers=max_workers,
+        cache=cache,
+        progress_every=progress_every,
+        rate_controller=rate_controller,
+    )
+    if not details:
+        return df
+
+    df_detail = pd.DataFrame.from_dict(details, orient="index")
+    df_detail.index.name = DETAIL_URL_COL
+    df_enriched = df.copy()
+    looked_up = df_detail.reindex(df_enriched[DETAIL_URL_COL])
+
+    for col in df_detail.columns:
+        values = looked_up[col].to_numpy()
+        if col in df_enriched.columns:
+            df_enriched[col] = df_enriched[col].where(df_enriched[col].notna(), values)
+        else:
+            df_enriched[col] = values
+
+    logging.info(
+        f"Enrichment selesai: {len(details)} halaman detail, "
+        f"{len(df_detail.columns)} atribut tambahan"
+    )
+    return df_enriched
@@ -1,119 +1,252 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 import logging
 import re
-import pytz
+import time
+from urllib.parse import urljoin
+
+from utils.lazy import lazy_attrs
+from utils.ratelimit import CircuitOpenError, parse_retry_after
+
+# Dependensi scraping hanya di-import saat stage extract dijalankan
+_lazy = lazy_attrs(globals(), {
+    "requests": ("requests", None),
+    "BeautifulSoup": ("bs4", "BeautifulSoup"),
+    "pytz": ("pytz", None),
+})
+__getattr__ = _lazy
 
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def extract_data(max_pages=50):
-    base_url = "https://fashion-studio.dicoding.dev"
+BASE_URL = "https://fashion-studio.dicoding.dev"
+
+
+def page_url(base_url, page):
+    return base_url if page == 1 else f"{base_url}/page{page}"
+
+
+def fetch_page(url, cache=None, timeout=30, controller=None, max_retries=2):
+    """
+    Ambil HTML halaman, lewat cache jika tersedia. Jika controller
+    (RateController) diberikan, request mengikuti batas konkurensi, timeout
+    adaptif, Retry-After, dan circuit breaker host tersebut.
+    """
+    if cache is not None:
+        cached = cache.get(url)
+        if cached is not None:
+            logging.info(f"Cache hit: {url}")
+            return cached
+
+    if controller is None:
+        response = _lazy("requests").get(url, timeout=timeout)
+        response.raise_for_status()
+    else:
+        response = _fetch_controlled(url, timeout, controller.for_url(url), max_retries)
+
+    if cache is not None:
+        cache.set(url, response.text)
+    return response.text
+
+
+def _fetch_controlled(url, timeout, host, max_retries):
+    requests = _lazy("requests")
+
+    for attempt in range(max_retries + 1):
+        probe = host.acquire()
+        started = time.monotonic()
+        ok = False
+        retry_after = None
+        # Hanya koneksi gagal, timeout, dan 5xx yang dihitung circuit breaker
+        host_failure = False
+        response = None
+        try:
+            response = requests.get(url, timeout=host.timeout(timeout))
+            if response.status_code in (429, 503):
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            response.raise_for_status()
+            ok = True
+        except requests.HTTPError:
+            host_failure = response.status_code >= 500
+            if (
+                retry_after is not None
+                and retry_after <= host.max_retry_after
+                and attempt < max_retries
+            ):
+                logging.warning(f"Server meminta jeda {retry_after:.0f} detik untuk {url}")
+                continue
+            raise
+        except (requests.ConnectionError, requests.Timeout):
+            host_failure = True
+            raise
+        finally:
+            # Setiap acquire() dilepas tepat sekali, apa pun exception-nya
+            host.release(
+                time.monotonic() - started,
+                ok=ok,
+                retry_after=retry_after,
+                host_failure=host_failure,
+                probe=probe,
+                throttled=not ok and response is not None and response.status_code == 429,
+            )
+        return response
+
+
+def parse_products(html, page_timestamp, detail_base_url=None):
+    """
+    Parse kartu produk dari HTML listing. Jika detail_base_url diisi, link
+    halaman detail tiap kartu ikut disimpan di kolom 'detail_url'.
+    """
     products = []
-    wib_timezone = pytz.timezone("Asia/Jakarta")
-    
-    try:
-        for page in range(1, max_pages + 1):
-            try:
-                url = base_url if page == 1 else f"{base_url}/page{page}"
-
-                logging.info(f"Scraping halaman {page}: {url}")
-                
-                response = requests.get(url, timeout=30)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, "html.parser")
-                product_cards = soup.find_all("div", class_="collection-card")
-                
-                if not product_cards:
-                    logging.info(f"Tidak ada produk di halaman {page}")
-                    continue
-                
-                page_timestamp = datetime.now(wib_timezone).isoformat()
-                
-                for card in product_cards:
-                    try:
-                        product_data = {
-                            "Title": None,
-                            "Price": None,
-                            "Rating": None,
-                            "Colors": None,
-                            "Size": None,
-                            "Gender": None,
-                            "scrape_timestamp": page_timestamp
-                        }
-                        
-                        # 1. Ekstrak Title
-                        title_tag = card.find("h3", class_="product-title")
-                        if title_tag:
-                            product_data["Title"] = title_tag.get_text(strip=True)
-                        else:
-                            logging.warning("Title tidak ditemukan")
-                            continue 
-                            
-                        # 2. Ekstrak Price
-                        price_tag = card.find(["span", "p"], class_="price")
-                        if price_tag:
-                            product_data['Price'] = price_tag.get_text(strip=True).replace("$", "")
-                        else:
-                            logging.warning("Harga tidak ditemukan")
-                            continue 
-                        
-                        # 3. Ekstrak Rating
-                        rating_tag = card.find("p", string=lambda text: "Rating" in str(text))
-                        if rating_tag:
-                            product_data["Rating"] = rating_tag.get_text(strip=True)
-                        else:
-                            logging.warning("Rating tidak ditemukan")
-                        
-                        # 4. Ekstrak Colors
-                        colors_tag = card.find("p", string=lambda text: "Colors" in str(text))
-                        if colors_tag:
-                            colors_text = colors_tag.get_text(strip=True)
-                            colors_value = re.search(r"\d+", colors_text)
-                            if colors_value:
-                                product_data["Colors"] = int(colors_value.group())
-                            else:
-                                logging.warning("Colors tidak valid ditemukan")
-                        else:
-                            logging.warning("Colors tidak ditemukan")
-                        
-                        # 5. Ekstrak Size
-                        size_tag = card.find("p", string=lambda text: "Size" in str(text))
-                        if size_tag:
-                            product_data["Size"] = size_tag.get_text(strip=True).split(":")[-1].strip()
-                        else:
-                            logging.warning("Size tidak ditemukan")
-                        
-                        # 6. Ekstrak Gender
-                        gender_tag = card.find("p", string=lambda text: "Gender" in str(text))
-                        if gender_tag:
-                            product_data["Gender"] = gender_tag.get_text(strip=True).split(":")[-1].strip()
-                        else:
-                            logging.warning("Gender tidak ditemukan")
-                        
-                        # Simpan data
-                        products.append(product_data)
-                        
-                    except Exception as e:
-                        logging.error(f"Gagal parsing produk: {str(e)}", exc_info=True)
-                        continue
-                        
-            except requests.RequestException as e:
-                logging.error(f"Gagal mengambil halaman {page}: {str(e)}")
+    soup = _lazy("BeautifulSoup")(html, "html.parser")
+    product_cards = soup.find_all("div", class_="collection-card")
+
+    for card in product_cards:
+        try:
+            product_data = {
+                "Title": None,
+                "Price": None,
+                "Rating": None,
+                "Colors": None,
+                "Size": None,
+                "Gender": None,
+                "scrape_timestamp": page_timestamp
+            }
+
+            # 1. Ekstrak Title
+            title_tag = card.find("h3", class_="product-title")
+            if title_tag:
+                product_data["Title"] = title_tag.get_text(strip=True)
+            else:
+                logging.warning("Title tidak ditemukan")
+                continue
+
+            # 2. Ekstrak Price
+            price_tag = card.find(["span", "p"], class_="price")
+            if price_tag:
+                product_data['Price'] = price_tag.get_text(strip=True).replace("$", "")
+            else:
+                logging.warning("Harga tidak ditemukan")
                 continue
 
-            # Logging jumlah input dari halaman
-            logging.info(f"Jumlah produk di halaman {page}: {len(products)}")
-                
+            # 3. Ekstrak Rating
+            rating_tag = card.find("p", string=lambda text: "Rating" in str(text))
+            if rating_tag:
+                product_data["Rating"] = rating_tag.get_text(strip=True)
+            else:
+                logging.warning("Rating tidak ditemukan")
+
+            # 4. Ekstrak Colors
+            colors_tag = card.find("p", string=lambda text: "Colors" in str(text))
+            if colors_tag:
+                colors_text = colors_tag.get_text(strip=True)
+                colors_value = re.search(r"\d+", colors_text)
+                if colors_value:
+                    product_data["Colors"] = int(colors_value.group())
+                else:
+                    logging.warning("Colors tidak valid ditemukan")
+            else:
+                logging.warning("Colors tidak ditemukan")
+
+            # 5. Ekstrak Size
+            size_tag = card.find("p", string=lambda text: "Size" in str(text))
+            if size_tag:
+                product_data["Size"] = size_tag.get_text(strip=True).split(":")[-1].strip()
+            else:
+                logging.warning("Size tidak ditemukan")
+
+            # 6. Ekstrak Gender
+            gender_tag = card.find("p", string=lambda text: "Gender" in str(text))
+            if gender_tag:
+                product_data["Gender"] = gender_tag.get_text(strip=True).split(":")[-1].strip()
+            else:
+                logging.warning("Gender tidak ditemukan")
+
+            # 7. Ekstrak link detail (opsional, untuk enrichment)
+            if detail_base_url is not None:
+                link_tag = card.find("a", href=True)
+                product_data["detail_url"] = (
+                    urljoin(detail_base_url + "/", link_tag["href"]) if link_tag else None
+                )
+
+            # Simpan data
+            products.append(product_data)
+
+        except Exception as e:
+            logging.error(f"Gagal parsing produk: {str(e)}", exc_info=True)
+            continue
+
+    return products
+
+
+def scrape_page(
+    base_url, page, cache=None, wib_timezone=None, with_detail_urls=False, controller=None
+):
+    requests = _lazy("requests")
+    wib_timezone = wib_timezone or _lazy("pytz").timezone("Asia/Jakarta")
+    url = page_url(base_url, page)
+
+    try:
+        logging.info(f"Scraping halaman {page}: {url}")
+        html = fetch_page(url, cache=cache, controller=controller)
+    except CircuitOpenError as e:
+        logging.warning(f"Halaman {page} dilewati: {str(e)}")
+        return []
+    except requests.RequestException as e:
+        logging.error(f"Gagal mengambil halaman {page}: {str(e)}")
+        return []
+
+    page_timestamp = datetime.now(wib_timezone).isoformat()
+    products = parse_products(
+        html, page_timestamp, detail_base_url=base_url if with_detail_urls else None
+    )
+    if not products:
+        logging.info(f"Tidak ada produk di halaman {page}")
+    else:
+        # Logging jumlah input dari halaman
+        logging.info(f"Jumlah produk di halaman {page}: {len(products)}")
+    return products
+
+
+def extract_data(
+    max_pages=50,
+    max_workers=1,
+    cache=None,
+    base_url=BASE_URL,
+    with_detail_urls=False,
+    rate_controller=None,
+):
+    products = []
+    wib_timezone = _lazy("pytz").timezone("Asia/Jakarta")
+    pages = range(1, max_pages + 1)
+
+    try:
+        if max_workers and max_workers > 1:
+            # Halaman diambil paralel, urutan hasil tetap mengikuti nomor halaman
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(
+                    lambda page: scrape_page(
+                        base_url, page, cache, wib_timezone, with_detail_urls, rate_controller
+                    ),
+                    pages,
+                )
+                for page_products in results:
+                    products.extend(page_products)
+        else:
+            for page in pages:
+                products.extend(
+                    scrape_page(
+                        base_url, page, cache, wib_timezone, with_detail_urls, rate_controller
+                    )
+                )
+
     except Exception as e:
         logging.critical(f"Error kritis: {str(e)}")
         return pd.DataFrame()
-    
+
     logging.info(f"Total data yang berhasil dikumpulkan: {len(products)}")
 
-    return pd.DataFrame(products)
\ No newline at end of file
+    return pd.DataFrame(products)
@@ -0,0 +1,34 @@
+import importlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def lazy_attrs(
+    module_globals: Dict[str, Any],
+    spec: Dict[str, Tuple[str, Optional[str]]],
+) -> Callable[[str], Any]:
+    """
+    Build a resolver for optional dependencies that are imported on first use.
+
+    ``spec`` maps a module-level name to ``(module_name, attribute)``; an
+    attribute of None binds the module itself. The resolved object is cached
+    in ``module_globals``, so ``mock.patch("utils.load.create_engine")`` keeps
+    working. Assign the resolver to ``__getattr__`` (PEP 562) and call it
+    inside functions instead of referencing the global name directly.
+    """
+    def resolve(name: str) -> Any:
+        try:
+            return module_globals[name]
+        except KeyError:
+            pass
+        if name not in spec:
+            raise AttributeError(
+                f"module {module_globals['__name__']!r} has no attribute {name!r}"
+            )
+        module_name, attribute = spec[name]
+        value = importlib.import_module(module_name)
+        if attribute is not None:
+            value = getattr(value, attribute)
+        module_globals[name] = value
+        return value
+
+    return resolve
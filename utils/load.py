@@ -1,17 +1,82 @@
 import logging
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
-import gspread
-from google.oauth2.service_account import Credentials
 from typing import Optional
 import csv
 
+from utils.lazy import lazy_attrs
+
+# Backend sink hanya di-import saat sink tersebut dipakai
+_lazy = lazy_attrs(globals(), {
+    "create_engine": ("sqlalchemy", "create_engine"),
+    "gspread": ("gspread", None),
+    "Credentials": ("google.oauth2.service_account", "Credentials"),
+    "sqltypes": ("sqlalchemy.types", None),
+})
+__getattr__ = _lazy
+
 class LoadError(Exception):
     """Custom exception for load errors in ETL pipeline."""
     pass
 
 
-def save_to_csv(df: pd.DataFrame, output_path: str):
+def _replace_quotes(value):
+    return value.replace('"', "'") if isinstance(value, str) else value
+
+
+def _isoformat(value):
+    return value.isoformat() if pd.notna(value) else None
+
+
+def _format_float32(values: pd.Series) -> list:
+    # Representasi terpendek float32 (3.9, bukan 3.9000000953674316)
+    return [
+        None if np.isnan(v) else np.format_float_positional(v, trim='0')
+        for v in values.to_numpy()
+    ]
+
+
+def _prepare_for_csv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ganti tanda kutip ganda pada kolom teks. Kolom category cukup diproses per
+    kategori; timestamp tz-aware ditulis ISO 8601 seperti output extract dan
+    float32 ditulis dengan representasi terpendeknya.
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            df[col] = df[col].map(_isoformat)
+        elif dtype == "float32":
+            df[col] = _format_float32(df[col])
+        elif dtype == object or isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            df[col] = df[col].map(_replace_quotes)
+    return df
+
+
+def _prepare_for_sheets(df: pd.DataFrame) -> list:
+    df = df.copy(deep=False)
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            df[col] = df[col].map(_isoformat)
+        elif isinstance(dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+        elif dtype == "float32":
+            df[col] = _format_float32(df[col])
+    return df.fillna("").astype(str).values.tolist()
+
+
+def _sql_dtypes(df: pd.DataFrame) -> Optional[dict]:
+    """Kolom float32 disimpan sebagai REAL; dtype lain dipetakan oleh pandas."""
+    float32_cols = [col for col in df.columns if df[col].dtype == "float32"]
+    if not float32_cols:
+        return None
+    sqltypes = _lazy("sqltypes")
+    return {col: sqltypes.REAL() for col in float32_cols}
+
+
+def save_to_csv(df: pd.DataFrame, output_path: str, append: bool = False):
     if not output_path or not isinstance(output_path, str):
         raise LoadError("Output path tidak valid untuk save_to_csv")
     
@@ -22,22 +87,40 @@ def save_to_csv(df: pd.DataFrame, output_path: str):
             raise ValueError("DataFrame kosong")
             
         # Clean special characters and format columns
-        df = df.applymap(lambda x: x.replace('"', "'") if isinstance(x, str) else x)
+        df = _prepare_for_csv(df)
         
-        df.to_csv(
-            output_path,
-            index=False,
-            quoting=csv.QUOTE_ALL,  # Handle special characters
-            encoding='utf-8-sig',   # Excel compatibility
-            date_format='%Y-%m-%d %H:%M:%S'
-        )
+        if append:
+            # Chunk lanjutan: tanpa header dan tanpa BOM kedua
+            df.to_csv(
+                output_path,
+                mode='a',
+                header=False,
+                index=False,
+                quoting=csv.QUOTE_ALL,
+                encoding='utf-8',
+                date_format='%Y-%m-%d %H:%M:%S'
+            )
+        else:
+            df.to_csv(
+                output_path,
+                index=False,
+                quoting=csv.QUOTE_ALL,  # Handle special characters
+                encoding='utf-8-sig',   # Excel compatibility
+                date_format='%Y-%m-%d %H:%M:%S'
+            )
         logging.info("CSV berhasil disimpan ke: %s", output_path)
         
     except Exception as e:
         logging.error("❌ Gagal menyimpan CSV: %s", e)
         raise LoadError(f"CSV Error: {str(e)}") from e
 
-def save_to_postgresql(df: pd.DataFrame, table_name: str, connection_string: str):
+def save_to_postgresql(
+    df: pd.DataFrame,
+    table_name: str,
+    connection_string: str,
+    chunksize: Optional[int] = None,
+    if_exists: str = 'replace'
+):
     if not isinstance(df, pd.DataFrame):
         logging.error("Parameter df bukan DataFrame")
         raise LoadError("DataFrame tidak valid untuk save_to_postgresql")
@@ -51,8 +134,16 @@ def save_to_postgresql(df: pd.DataFrame, table_name: str, connection_string: str
         logging.error("connection_string tidak diberikan atau kosong")
         raise LoadError("Connection string tidak valid untuk save_to_postgresql")
     try:
+        create_engine = _lazy("create_engine")
         engine = create_engine(connection_string)
-        df.to_sql(table_name, con=engine, if_exists='replace', index=False)
+        df.to_sql(
+            table_name,
+            con=engine,
+            if_exists=if_exists,
+            index=False,
+            chunksize=chunksize,
+            dtype=_sql_dtypes(df)
+        )
         logging.info("DataFrame berhasil disimpan ke PostgreSQL di tabel: %s", table_name)
     except Exception as e:
         logging.error("❌ Gagal menyimpan DataFrame ke PostgreSQL: %s", e)
@@ -62,9 +153,10 @@ def save_to_google_sheets(
     df: pd.DataFrame,
     spreadsheet_id: str,
     range_name: str = "Sheet1!A1",
-    credentials_path: Optional[str] = None
+    credentials_path: Optional[str] = None,
+    append: bool = False
 ) -> None:
-    """Save DataFrame to Google Sheets"""
+    """Save DataFrame to Google Sheets (append=True adds rows below existing data)"""
     try:
         # Validate input
         if not credentials_path:
@@ -73,6 +165,9 @@ def save_to_google_sheets(
         if df.empty:
             raise ValueError("DataFrame tidak boleh kosong")
 
+        gspread = _lazy("gspread")
+        Credentials = _lazy("Credentials")
+
         # Authenticate with modern library
         scopes = [
             'https://www.googleapis.com/auth/spreadsheets',
@@ -100,22 +195,28 @@ def save_to_google_sheets(
             worksheet = spreadsheet.sheet1
             cell_range = range_name
 
-        # Clear existing data
-        try:
-            worksheet.batch_clear([f"{cell_range}:ZZZ100000"])
-        except gspread.exceptions.APIError as e:
-            logging.warning("Peringatan saat membersihkan sheet: %s", e)
-
-        # Prepare data
-        data = [df.columns.tolist()] + df.fillna("").astype(str).values.tolist()
-
-        # Update sheet
-        worksheet.update(
-            range_name=cell_range,
-            values=data,
-            value_input_option='USER_ENTERED'
-        )
-        
+        if append:
+            worksheet.append_rows(
+                _prepare_for_sheets(df),
+                value_input_option='USER_ENTERED'
+            )
+        else:
+            # Clear existing data
+            try:
+                worksheet.batch_clear([f"{cell_range}:ZZZ100000"])
+            except gspread.exceptions.APIError as e:
+                logging.warning("Peringatan saat membersihkan sheet: %s", e)
+
+            # Prepare data
+            data = [df.columns.tolist()] + _prepare_for_sheets(df)
+
+            # Update sheet
+            worksheet.update(
+                range_name=cell_range,
+                values=data,
+                value_input_option='USER_ENTERED'
+            )
+
         logging.info("Data berhasil diupload ke Google Sheets: %s", spreadsheet_id)
         logging.info("URL: https://docs.google.com/spreadsheets/d/%s", spreadsheet_id)
 
@@ -0,0 +1,251 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host's circuit breaker rejects a request without sending it."""
+    pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse header Retry-After (detik atau HTTP-date) menjadi jumlah detik."""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostController:
+    """
+    Adaptive concurrency limit and circuit breaker for a single host.
+
+    The limit follows AIMD: every fast, successful response adds 1/limit
+    (about +1 per round of requests), while an error or a response slower
+    than ``slow_factor`` times the latency baseline halves it. A
+    ``Retry-After`` pauses new requests until the given time.
+
+    Only connection errors, timeouts and 5xx responses count as failures.
+    Other errors, such as a 404 for a missing page, are counted but leave
+    the limit and the breaker alone. After ``failure_threshold``
+    consecutive failures the breaker opens and requests fail immediately
+    with CircuitOpenError. Once ``cooldown``
+    seconds pass, a single probe request is let through (half-open). Its
+    result closes or re-opens the breaker.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 16,
+        slow_factor: float = 3.0,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        min_timeout: float = 5.0,
+        max_timeout: float = 30.0,
+        max_retry_after: float = 120.0,
+    ):
+        self.host = host
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.slow_factor = slow_factor
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_retry_after = max_retry_after
+
+        self.state = CLOSED
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.latency_min: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.blocked_until = 0.0
+        self.counters = {"requests": 0, "errors": 0, "rejected": 0, "throttled": 0}
+
+        self._probe_in_flight = False
+        self._cond = threading.Condition()
+
+    def timeout(self, default: float) -> float:
+        """Timeout request: kelipatan latency yang teramati, dibatasi min/max."""
+        if self.latency_ewma is None:
+            return min(default, self.max_timeout)
+        adaptive = self.latency_ewma * self.slow_factor * 2
+        return max(self.min_timeout, min(default, self.max_timeout, adaptive))
+
+    def acquire(self) -> bool:
+        """
+        Tunggu slot request. Mengembalikan True jika request ini adalah probe
+        half-open; nilai itu harus diteruskan ke release(probe=...).
+        """
+        probe = False
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.state == OPEN:
+                    if now - self.opened_at < self.cooldown:
+                        self.counters["rejected"] += 1
+                        raise CircuitOpenError(
+                            f"Circuit breaker terbuka untuk {self.host}, request dilewati"
+                        )
+                    self.state = HALF_OPEN
+                if self.state == HALF_OPEN:
+                    if self._probe_in_flight:
+                        self.counters["rejected"] += 1
+                        raise CircuitOpenError(
+                            f"Circuit breaker {self.host} sedang menguji koneksi, request dilewati"
+                        )
+                    self._probe_in_flight = True
+                    probe = True
+                    break
+                if now < self.blocked_until:
+                    self._cond.wait(self.blocked_until - now)
+                    continue
+                if self.in_flight < int(self.limit):
+                    break
+                self._cond.wait()
+
+            self.in_flight += 1
+            self.counters["requests"] += 1
+        return probe
+
+    def release(
+        self,
+        latency: float,
+        ok: bool,
+        retry_after: Optional[float] = None,
+        host_failure: bool = True,
+        probe: bool = False,
+        throttled: bool = False,
+    ) -> None:
+        """
+        Catat hasil request. host_failure=False untuk error yang bukan salah
+        host (misalnya 404): dihitung sebagai error, tanpa mengubah limit
+        atau circuit breaker. throttled=True (429 tanpa Retry-After) tetap
+        menurunkan limit tanpa dihitung circuit breaker. Hanya probe (hasil acquire()) yang boleh
+        menutup breaker yang sedang half-open; request lain yang dimulai
+        sebelum breaker terbuka tidak mengubah state-nya.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if probe:
+                self._probe_in_flight = False
+
+            throttled = throttled or retry_after is not None
+            if throttled:
+                self.counters["throttled"] += 1
+            if retry_after is not None:
+                wait = min(retry_after, self.max_retry_after)
+                self.blocked_until = max(self.blocked_until, time.monotonic() + wait)
+
+            self.error_rate = 0.8 * self.error_rate + (0.0 if ok else 0.2)
+            if ok:
+                self._record_latency(latency)
+                if probe or self.state == CLOSED:
+                    self.consecutive_failures = 0
+                    self.state = CLOSED
+                slow = latency > self.latency_min * self.slow_factor
+                if slow:
+                    self._decrease()
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            elif throttled:
+                # Throttling (429, atau 503 + Retry-After): host sehat tapi minta pelan
+                self.counters["errors"] += 1
+                self._decrease()
+            elif not host_failure:
+                # Misalnya 404: bukan tanda host bermasalah
+                self.counters["errors"] += 1
+            else:
+                self.counters["errors"] += 1
+                self.consecutive_failures += 1
+                self._decrease()
+                tripped = self.consecutive_failures >= self.failure_threshold
+                if probe or (self.state == CLOSED and tripped):
+                    self.state = OPEN
+                    self.opened_at = time.monotonic()
+
+            self._cond.notify_all()
+
+    def _record_latency(self, latency: float) -> None:
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+        self.latency_min = latency if self.latency_min is None else min(self.latency_min, latency)
+
+    def _decrease(self) -> None:
+        self.limit = max(self.min_limit, self.limit / 2)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "state": self.state,
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "latency_ewma": None if self.latency_ewma is None else round(self.latency_ewma, 3),
+                "error_rate": round(self.error_rate, 3),
+                "consecutive_failures": self.consecutive_failures,
+                **self.counters,
+            }
+
+
+def merge_metrics(per_source: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Gabungkan RateController.metrics() dari beberapa proses (misalnya worker
+    crawl) per host: counter dijumlahkan, snapshot tiap sumber disimpan di
+    "sources".
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for source, hosts in per_source.items():
+        for host, snapshot in (hosts or {}).items():
+            entry = merged.setdefault(
+                host, {"requests": 0, "errors": 0, "rejected": 0, "throttled": 0, "sources": {}}
+            )
+            for key in ("requests", "errors", "rejected", "throttled"):
+                entry[key] += snapshot.get(key, 0)
+            entry["sources"][source] = snapshot
+    return merged
+
+
+class RateController:
+    """Registry of HostController per host; all hosts share the same settings."""
+
+    def __init__(self, **host_settings):
+        self.host_settings = host_settings
+        self._hosts: Dict[str, HostController] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> HostController:
+        host = urlsplit(url).netloc or url
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostController(host, **self.host_settings)
+            return self._hosts[host]
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: controller.snapshot() for host, controller in hosts.items()}
@@ -0,0 +1,133 @@
+import logging
+import os
+import shutil
+import tempfile
+from typing import Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from utils.dedup import KeyIndex
+from utils.transform import transform_data, TransformationError
+
+# Kolom dan dtype file product.csv yang ditulis save_to_csv()
+TRANSFORMED_DTYPES = {
+    "Title": str,
+    "Price": "float64",
+    "Rating": "float64",
+    "Colors": "Int64",
+    "Size": str,
+    "Gender": str,
+    "scrape_timestamp": str,
+}
+
+SCHEMAS = ("transformed", "raw")
+
+
+class ReaderError(Exception):
+    """Custom exception for reading exported CSV files in ETL pipeline."""
+    pass
+
+
+def read_raw_csv(path):
+    """Baca CSV hasil extract (semua kolom sebagai teks, seperti hasil scraping)."""
+    return pd.read_csv(path, dtype=str, encoding="utf-8-sig")
+
+
+def read_transformed_csv(path):
+    """Baca CSV hasil transform dengan dtype yang sama seperti output transform_data()."""
+    return pd.read_csv(
+        path, dtype=TRANSFORMED_DTYPES, encoding="utf-8-sig", float_precision="round_trip"
+    )
+
+
+def iter_csv_chunks(
+    paths: Iterable[str],
+    chunksize: int = 50_000,
+    schema: str = "transformed",
+    key_columns: Optional[List[str]] = None,
+    skip_seen: bool = True,
+    memory_map: bool = True,
+    key_index: Optional[KeyIndex] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream CSV exports chunk per chunk without loading whole files into RAM.
+
+    Files are read with memory_map and encoding utf-8-sig (the BOM that
+    save_to_csv writes is stripped). schema="transformed" reads product.csv
+    files with the declared dtypes and passes them through without calling
+    transform_data again. schema="raw" reads extract dumps as text and
+    transforms each chunk.
+
+    With skip_seen, rows whose key_columns (default: all columns except
+    scrape_timestamp) were already produced by an earlier chunk or file
+    are dropped, so overlapping historical exports are only loaded once.
+    Without key_index the seen keys spill to a temporary SQLite file that
+    is removed when the iterator finishes, so memory stays bounded however
+    large the exports are. Pass a persistent key_index (utils.dedup.KeyIndex
+    with a path) to skip rows from earlier runs as well.
+    """
+    if schema not in SCHEMAS:
+        raise ReaderError(f"Schema tidak dikenal: {schema}")
+    if chunksize < 1:
+        raise ReaderError("chunksize minimal 1")
+
+    dtype = TRANSFORMED_DTYPES if schema == "transformed" else str
+    tmp_dir = None
+    if skip_seen and key_index is None:
+        tmp_dir = tempfile.mkdtemp(prefix="etl-backfill-")
+        key_index = KeyIndex(key_columns, path=os.path.join(tmp_dir, "seen.sqlite"))
+
+    try:
+        yield from _read_chunks(paths, chunksize, schema, dtype, skip_seen, memory_map, key_index)
+    finally:
+        if tmp_dir is not None:
+            key_index.close(commit=False)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _read_chunks(paths, chunksize, schema, dtype, skip_seen, memory_map, key_index):
+    for path in paths:
+        logging.info("Membaca export: %s (schema=%s)", path, schema)
+        try:
+            reader = pd.read_csv(
+                path,
+                dtype=dtype,
+                encoding="utf-8-sig",
+                chunksize=chunksize,
+                memory_map=memory_map,
+                float_precision="round_trip",
+            )
+        except (OSError, ValueError) as e:
+            raise ReaderError(f"Gagal membaca {path}: {e}") from e
+
+        with reader:
+            number = 0
+            chunks = iter(reader)
+            while True:
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    break
+                except (ValueError, pd.errors.ParserError) as e:
+                    raise ReaderError(
+                        f"Gagal membaca chunk {number + 1} dari {path}: {e}"
+                    ) from e
+                number += 1
+
+                if schema == "raw":
+                    try:
+                        chunk = transform_data(chunk)
+                    except TransformationError as e:
+                        logging.error("Chunk %d dari %s dilewati: %s", number, path, e)
+                        continue
+
+                if skip_seen and not chunk.empty:
+                    fresh = key_index.mark_new(chunk)
+                    skipped = int((~fresh).sum())
+                    if skipped:
+                        logging.info("Chunk %d dari %s: %d baris sudah ada, dilewati",
+                                     number, path, skipped)
+                    chunk = chunk[fresh]
+
+                if not chunk.empty:
+                    yield chunk
@@ -1,13 +1,15 @@
 import pandas as pd
 from typing import Dict, Any
 
+from utils.dedup import duplicate_mask
+
 class TransformationError(Exception):
     def __init__(self, message: str, errors: Dict[str, Any] = None):
         super().__init__(message)
         self.errors = errors or {}
 
 
-def transform_data(df: pd.DataFrame) -> pd.DataFrame:
+def transform_data(df: pd.DataFrame, key_index=None) -> pd.DataFrame:
     required_cols = ['Title', 'Price', 'scrape_timestamp']
 
     # 1. Periksa kolom wajib sebelum pemrosesan
@@ -26,8 +28,12 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     if 'Rating' not in df_tf.columns:
         df_tf['Rating'] = pd.NA
 
-    # 2. Hapus duplikat persis (full row) seperti semula
-    df_tf = df_tf.drop_duplicates()
+    # 2. Hapus duplikat persis (full row) seperti semula; dengan key_index
+    #    (utils.dedup.KeyIndex) duplikat juga dikenali lintas chunk/run
+    if key_index is None:
+        df_tf = df_tf[~duplicate_mask(df_tf).to_numpy()]
+    else:
+        df_tf = key_index.filter(df_tf)
 
     # 3. Filter invalid: buang yang judulnya tepat 'Unknown Product'
     df_tf = df_tf[df_tf['Title'].str.strip().str.lower() != 'unknown product']
@@ -81,6 +87,58 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     return df_tf
 
 
+# Selisih maksimum yang diterima saat Price/Rating diubah ke float32
+FLOAT32_TOLERANCE = 1e-3
+
+
+def compact_frame(df: pd.DataFrame, tz: str = "Asia/Jakarta") -> pd.DataFrame:
+    """
+    Skema hemat memori untuk output transform_data():
+      - Title, Size, Gender → category (dictionary encoding), jika nilai
+        unik tidak lebih dari setengah jumlah baris
+      - scrape_timestamp → datetime64 tz-aware (zona waktu tz)
+      - Price, Rating → float32, hanya jika konversi tidak mengubah nilai
+        lebih dari FLOAT32_TOLERANCE (harga IDR di atas 2^24 tetap float64)
+      - Colors → Int8
+    """
+    df_c = df.copy()
+
+    for col in ['Title', 'Size', 'Gender']:
+        if col in df_c.columns and df_c[col].nunique() <= len(df_c) / 2:
+            df_c[col] = df_c[col].astype('category')
+
+    if 'scrape_timestamp' in df_c.columns:
+        df_c['scrape_timestamp'] = pd.to_datetime(
+            df_c['scrape_timestamp'], utc=True, format='ISO8601'
+        ).dt.tz_convert(tz)
+
+    for col in ['Price', 'Rating']:
+        if col in df_c.columns:
+            values = df_c[col].astype('float64')
+            narrow = values.astype('float32')
+            error = (narrow.astype('float64') - values).abs().max()
+            if pd.isna(error) or error <= FLOAT32_TOLERANCE:
+                df_c[col] = narrow
+
+    if 'Colors' in df_c.columns:
+        colors = pd.to_numeric(df_c['Colors'], errors='coerce')
+        if colors.dropna().between(-128, 127).all():
+            df_c['Colors'] = colors.astype('Int8')
+
+    return df_c
+
+
+def memory_report(df: pd.DataFrame) -> Dict[str, Any]:
+    """Ukuran DataFrame di memori (deep), total dan per baris."""
+    total = int(df.memory_usage(deep=True, index=False).sum())
+    rows = len(df)
+    return {
+        'rows': rows,
+        'bytes': total,
+        'bytes_per_row': round(total / rows, 1) if rows else 0.0,
+    }
+
+
 def validate_transformed_data(df: pd.DataFrame) -> Dict[str, Any]:
     if df.empty:
         raise ValueError("Data kosong")
@@ -90,7 +148,7 @@ def validate_transformed_data(df: pd.DataFrame) -> Dict[str, Any]:
         df_val['Price'] = pd.to_numeric(df_val['Price'], errors='coerce')
 
     # Hitung validasi
-    duplicates = df_val.duplicated().sum()
+    duplicates = int(duplicate_mask(df_val).sum())
     null_values = df_val[['Title', 'Price']].isnull().sum().to_dict()
     invalid_titles = df_val['Title'].str.strip().str.lower().eq('unknown product').sum()
     price_min = df_val['Price'].min() if not df_val.empty else None
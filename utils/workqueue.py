@@ -0,0 +1,406 @@
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.cache import ResponseCache
+from utils.extract import fetch_page, page_url, parse_products
+from utils.lazy import lazy_attrs
+from utils.ratelimit import RateController
+
+_lazy = lazy_attrs(globals(), {"pytz": ("pytz", None)})
+__getattr__ = _lazy
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    site TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    leased_until REAL,
+    worker TEXT,
+    error TEXT,
+    PRIMARY KEY (site, page)
+);
+CREATE TABLE IF NOT EXISTS results (
+    site TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (site, page)
+);
+CREATE TABLE IF NOT EXISTS worker_stats (
+    worker TEXT PRIMARY KEY,
+    pages INTEGER NOT NULL,
+    rate_control TEXT
+);
+"""
+
+
+class QueueError(Exception):
+    """Custom exception for work queue errors in ETL pipeline."""
+    pass
+
+
+class WorkQueue:
+    """
+    SQLite-backed queue of (site, page) crawl jobs.
+
+    Jobs are leased rather than popped: a claimed job becomes visible again
+    once its lease expires, so a crashed worker's page is retried by someone
+    else (at-least-once). Results are keyed by (site, page), which makes a
+    page that is processed twice overwrite, not duplicate, its products.
+
+    Every process opens its own connection. The database file may live on a
+    filesystem shared by several machines as long as it supports POSIX locks.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        try:
+            self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+            self._conn.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            raise QueueError(f"Gagal membuka queue {path}: {e}") from e
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def reset(self) -> None:
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM jobs")
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute("DELETE FROM worker_stats")
+
+    def enqueue(self, site: str, pages: Iterable[int]) -> int:
+        """Tambahkan job; job (site, page) yang sudah ada diabaikan."""
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (site, page) VALUES (?, ?)",
+                ((site, page) for page in pages),
+            )
+            return self._conn.total_changes - before
+
+    def claim(self, worker: str) -> Optional[Tuple[str, int]]:
+        now = time.time()
+        with self._conn:
+            # BEGIN IMMEDIATE mengunci database sehingga dua worker tidak
+            # bisa mengambil job yang sama
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                """
+                SELECT site, page FROM jobs
+                WHERE status = 'pending'
+                   OR (status = 'leased' AND leased_until < ?)
+                ORDER BY attempts, site, page
+                LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                """
+                UPDATE jobs SET status = 'leased', attempts = attempts + 1,
+                                leased_until = ?, worker = ?
+                WHERE site = ? AND page = ?
+                """,
+                (now + self.lease_seconds, worker, row[0], row[1]),
+            )
+        return row[0], row[1]
+
+    def complete(self, site: str, page: int, products: List[Dict], worker: str) -> bool:
+        """
+        Simpan hasil job yang masih di-lease worker ini. Mengembalikan False
+        (hasil diabaikan) jika lease sudah diambil alih worker lain.
+        """
+        payload = json.dumps(products, default=str)
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            updated = self._conn.execute(
+                "UPDATE jobs SET status = 'done', leased_until = NULL, error = NULL "
+                "WHERE site = ? AND page = ? AND worker = ? AND status = 'leased'",
+                (site, page, worker),
+            ).rowcount
+            if updated:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (site, page, payload) VALUES (?, ?, ?)",
+                    (site, page, payload),
+                )
+        return bool(updated)
+
+    def fail(self, site: str, page: int, error: str, worker: str) -> bool:
+        """
+        Kembalikan job ke antrian, atau tandai gagal setelah max_attempts.
+        Hanya berlaku jika job masih di-lease worker ini.
+        """
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            updated = self._conn.execute(
+                """
+                UPDATE jobs
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    leased_until = NULL, error = ?
+                WHERE site = ? AND page = ? AND worker = ? AND status = 'leased'
+                """,
+                (self.max_attempts, error, site, page, worker),
+            ).rowcount
+        return bool(updated)
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return dict(rows.fetchall())
+
+    def unfinished(self) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')"
+        ).fetchone()
+        return row[0]
+
+    def record_worker(self, worker: str, pages: int, rate_control: Optional[Dict]) -> None:
+        """Simpan ringkasan worker (halaman diproses, RateController.metrics())."""
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO worker_stats (worker, pages, rate_control) "
+                "VALUES (?, ?, ?)",
+                (worker, pages, None if rate_control is None else json.dumps(rate_control)),
+            )
+
+    def worker_stats(self) -> Dict[str, Dict]:
+        rows = self._conn.execute(
+            "SELECT worker, pages, rate_control FROM worker_stats ORDER BY worker"
+        )
+        stats = {}
+        for worker, pages, rate_control in rows.fetchall():
+            stats[worker] = {
+                "pages": pages,
+                "rate_control": json.loads(rate_control) if rate_control else None,
+            }
+        return stats
+
+    def collect(self) -> List[Dict]:
+        """Gabungkan hasil semua shard, urut per site lalu halaman."""
+        products = []
+        rows = self._conn.execute("SELECT payload FROM results ORDER BY site, page")
+        for (payload,) in rows:
+            products.extend(json.loads(payload))
+        return products
+
+
+def run_worker(
+    db_path: str,
+    worker: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    cache_ttl: float = 3600,
+    with_detail_urls: bool = False,
+    poll_interval: float = 1.0,
+    lease_seconds: float = 300,
+    max_attempts: int = 3,
+    rate_control: Optional[Dict] = None,
+) -> int:
+    """
+    Ambil dan proses job dari queue sampai tidak ada job tersisa.
+    Dapat dijalankan di mesin lain: python -m utils.workqueue <db_path>
+    rate_control berisi pengaturan RateController (None = tanpa rate limiter).
+    Mengembalikan jumlah halaman yang diproses worker ini.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    cache = ResponseCache(ttl=cache_ttl, cache_dir=cache_dir) if cache_dir else None
+    controller = RateController(**rate_control) if rate_control is not None else None
+    wib_timezone = _lazy("pytz").timezone("Asia/Jakarta")
+    processed = 0
+
+    try:
+        while True:
+            job = queue.claim(worker)
+            if job is None:
+                # Job yang masih di-lease worker lain bisa kembali jika lease-nya habis
+                if queue.unfinished() == 0:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            site, page = job
+            url = page_url(site, page)
+            try:
+                logging.info(f"[{worker}] Scraping halaman {page}: {url}")
+                html = fetch_page(url, cache=cache, controller=controller)
+                page_timestamp = datetime.now(wib_timezone).isoformat()
+                products = parse_products(
+                    html, page_timestamp, detail_base_url=site if with_detail_urls else None
+                )
+            except Exception as e:
+                logging.error(f"[{worker}] Gagal memproses halaman {page} ({site}): {str(e)}")
+                queue.fail(site, page, str(e), worker)
+                continue
+
+            if not queue.complete(site, page, products, worker):
+                logging.warning(
+                    f"[{worker}] Lease halaman {page} ({site}) sudah habis, hasil diabaikan"
+                )
+                continue
+            processed += 1
+
+        # Koordinator membaca statistik ini untuk run metrics
+        queue.record_worker(
+            worker, processed, controller.metrics() if controller is not None else None
+        )
+    finally:
+        queue.close()
+
+    logging.info(f"[{worker}] Selesai, {processed} halaman diproses")
+    if controller is not None:
+        logging.info(f"[{worker}] Rate control: {controller.metrics()}")
+    return processed
+
+
+def crawl_sharded(
+    sites: List[str],
+    max_pages: int,
+    db_path: str,
+    num_workers: int = 4,
+    cache_dir: Optional[str] = None,
+    cache_ttl: float = 3600,
+    with_detail_urls: bool = False,
+    reset: bool = True,
+    lease_seconds: float = 300,
+    max_attempts: int = 3,
+    rate_control: Optional[Dict] = None,
+    metrics: Optional[Dict] = None,
+) -> pd.DataFrame:
+    """
+    Koordinator crawl multi-site: isi queue dengan semua (site, page), jalankan
+    num_workers proses worker, lalu gabungkan hasil shard menjadi DataFrame
+    dengan format yang sama seperti extract_data().
+
+    num_workers=0 menjalankan worker di proses ini (untuk debugging).
+    reset=False melanjutkan queue yang sudah ada; halaman yang selesai tidak diulang.
+    QueueError jika ada worker yang keluar dengan error atau job yang belum
+    selesai, supaya hasil parsial tidak diperlakukan sebagai extract lengkap.
+    Jika metrics (dict) diberikan, statistik tiap worker diisi ke metrics["workers"].
+    """
+    queue = WorkQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    try:
+        if reset:
+            queue.reset()
+        for site in sites:
+            added = queue.enqueue(site.rstrip("/"), range(1, max_pages + 1))
+            logging.info(f"Queue: {added} job baru untuk {site}")
+
+        worker_kwargs = dict(
+            cache_dir=cache_dir,
+            cache_ttl=cache_ttl,
+            with_detail_urls=with_detail_urls,
+            lease_seconds=lease_seconds,
+            max_attempts=max_attempts,
+            rate_control=rate_control,
+        )
+        if num_workers <= 0:
+            run_worker(db_path, **worker_kwargs)
+        else:
+            processes = [
+                multiprocessing.Process(
+                    target=run_worker,
+                    args=(db_path,),
+                    kwargs=dict(worker_kwargs, worker=f"{socket.gethostname()}:shard{i}"),
+                )
+                for i in range(num_workers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            crashed = [p.exitcode for p in processes if p.exitcode != 0]
+            if crashed:
+                raise QueueError(
+                    f"{len(crashed)} worker keluar dengan error (exit code {crashed}); "
+                    "jalankan ulang dengan queue_resume untuk melanjutkan"
+                )
+
+        counts = queue.counts()
+        logging.info(f"Status queue: {counts}")
+        unfinished = queue.unfinished()
+        if unfinished:
+            raise QueueError(
+                f"{unfinished} job belum selesai; jalankan ulang dengan queue_resume "
+                "untuk melanjutkan"
+            )
+        if counts.get("failed"):
+            logging.warning(f"{counts['failed']} halaman gagal setelah {max_attempts} percobaan")
+
+        if metrics is not None:
+            metrics["workers"] = queue.worker_stats()
+        products = queue.collect()
+    finally:
+        queue.close()
+
+    logging.info(f"Total data yang berhasil dikumpulkan: {len(products)}")
+    return pd.DataFrame(products)
+
+
+def worker_main(argv: Optional[List[str]] = None) -> int:
+    """
+    CLI worker tambahan, misalnya di mesin lain. Opsi rate control, lease,
+    dan percobaan sama dengan crawl_sharded/main.py supaya semua worker
+    memakai pengaturan yang sama.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Jalankan worker crawl untuk queue SQLite.")
+    parser.add_argument("db_path")
+    parser.add_argument("--cache-dir")
+    parser.add_argument("--cache-ttl", type=float, default=3600)
+    parser.add_argument("--with-detail-urls", action="store_true")
+    parser.add_argument("--lease-seconds", type=float, default=300)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument(
+        "--no-rate-control", dest="rate_control", action="store_false",
+        help="Matikan rate limiter adaptif dan circuit breaker",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Batas awal request paralel per host"
+    )
+    parser.add_argument(
+        "--max-limit", type=int, default=None,
+        help="Batas maksimum request paralel per host (default: --workers)",
+    )
+    parser.add_argument("--breaker-failures", type=int, default=5)
+    parser.add_argument("--breaker-cooldown", type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    rate_control = None
+    if args.rate_control:
+        rate_control = {
+            "initial_limit": args.workers,
+            "max_limit": max(args.workers, args.max_limit or args.workers),
+            "failure_threshold": args.breaker_failures,
+            "cooldown": args.breaker_cooldown,
+        }
+    return run_worker(
+        args.db_path,
+        cache_dir=args.cache_dir,
+        cache_ttl=args.cache_ttl,
+        with_detail_urls=args.with_detail_urls,
+        poll_interval=args.poll_interval,
+        lease_seconds=args.lease_seconds,
+        max_attempts=args.max_attempts,
+        rate_control=rate_control,
+    )
+
+
+if __name__ == "__main__":
+    worker_main()